@@ -5,21 +5,241 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import math
+from timeit import default_timer
+
 from qtpy import QtWidgets, QtGui, QtCore
 from QNotifications.abstractions import *
+from QNotifications.clock import default_clock
 
 __author__ = u"Daniel Schreij"
 __license__ = u"GPLv3"
 
+CATEGORIES = [u'primary', u'success', u'info', u'warning', u'danger']
+""" The categories a notification can have """
+
+def check_category(value):
+	""" Raises a ValueError if value is not one of CATEGORIES. """
+	if not value in CATEGORIES:
+		raise ValueError(u'\"{}\" is not a valid value. '
+			'Should be one of {}'.format(value, str(CATEGORIES)))
+
+EXPANDED_HEIGHT = 300
+""" The height of the view that shows the full text of a shortened message """
+
+def elide_message(message, maxChars=None, maxLines=None):
+	""" Shortens a message to at most maxChars characters and maxLines lines,
+	and marks the cut with an ellipsis. Only the part of the message that is
+	kept is scanned, so this takes the same time for messages of any length.
+
+	Parameters
+	----------
+	message : str
+		The message
+	maxChars : int, optional
+		The maximum number of characters
+	maxLines : int, optional
+		The maximum number of lines
+
+	Returns
+	-------
+	tuple
+		The (possibly shortened) message, and whether it was shortened
+	"""
+	end = len(message)
+	if maxChars is not None and end > maxChars:
+		end = maxChars
+	if maxLines is not None:
+		pos = -1
+		for i in range(maxLines):
+			pos = message.find(u'\n', pos + 1, end)
+			if pos < 0:
+				break
+		else:
+			end = pos
+	if end == len(message):
+		return message, False
+	return message[:end].rstrip() + u'\u2026', True
+
+def preview_message(message, maxChars=None, maxLines=None):
+	""" Returns the text that a notification shows at first for a message
+	that may still be bytes: the decoded and elided message. Of a long bytes
+	message, only the part that can be shown is decoded.
+
+	Parameters
+	----------
+	message : str or bytes
+		The message
+	maxChars : int, optional
+		The maximum number of characters
+	maxLines : int, optional
+		The maximum number of lines
+
+	Returns
+	-------
+	str
+		The message as elide_message() shortens it
+	"""
+	if not isinstance(message, str):
+		# A character takes at most four bytes in UTF-8. One character more
+		# is decoded, so that the cut is still noticed.
+		if maxChars is not None and len(message) > 4 * (maxChars + 1):
+			message = decode_prefix(message[:4 * (maxChars + 1)])
+		else:
+			message = safe_decode(message, errors=u'replace')
+	return elide_message(message, maxChars, maxLines)[0]
+
+BACKGROUND_CACHE_PREFIX = u'QNotifications/background/'
+""" The prefix of the keys of the backgrounds in QPixmapCache """
+
+def _style_sheets(widget):
+	""" The style sheets that apply to widget, from the application down. """
+	sheets = []
+	while widget is not None:
+		sheets.append(widget.styleSheet())
+		widget = widget.parentWidget()
+	app = QtWidgets.QApplication.instance()
+	if app is not None:
+		sheets.append(app.styleSheet())
+	return tuple(sheets)
+
+def paint_background(widget, painter):
+	""" Paints the styled background of widget, which is rendered once into
+	a pixmap and then taken from QPixmapCache. The pixmaps are shared by all
+	widgets with the same class, object name (the category, for
+	notifications), size, device pixel ratio, state and style sheets.
+
+	Returns
+	-------
+	bool
+		True if the background was taken from the cache
+	"""
+	option = QtWidgets.QStyleOption()
+	option.initFrom(widget)
+	size = widget.size()
+	ratio = widget.devicePixelRatioF()
+	key = u'{}{}/{}/{}x{}/{}/{}/{}'.format(BACKGROUND_CACHE_PREFIX,
+		widget.metaObject().className(), widget.objectName(), size.width(),
+		size.height(), ratio, int(option.state), hash(_style_sheets(widget)))
+	pixmap = QtGui.QPixmapCache.find(key)
+	if pixmap is not None and not pixmap.isNull():
+		painter.drawPixmap(0, 0, pixmap)
+		return True
+	pixmap = QtGui.QPixmap(int(math.ceil(size.width() * ratio)),
+		int(math.ceil(size.height() * ratio)))
+	pixmap.setDevicePixelRatio(ratio)
+	pixmap.fill(QtCore.Qt.transparent)
+	pixmapPainter = QtGui.QPainter(pixmap)
+	widget.style().drawPrimitive(QtWidgets.QStyle.PE_Widget, option,
+		pixmapPainter, widget)
+	pixmapPainter.end()
+	QtGui.QPixmapCache.insert(key, pixmap)
+	painter.drawPixmap(0, 0, pixmap)
+	return False
+
 class MessageLabel(QtWidgets.QLabel):
 	""" Subclass of QLabel, which reimplements the resizeEvent() function. This
 	is necessary because otherwise the notifications take up too much vertical
 	space when texts they display become longer. This is because normally the height
 	of a notification is calculated as the minimum height necessary for the text
-	when the widget is horizontally resized to its minimum. """
+	when the widget is horizontally resized to its minimum.
+
+	If a StaticTextCache is passed, the label paints the text itself from a
+	prepared QStaticText taken from the cache, instead of letting QLabel lay
+	out the text again for every label. If a TextLayoutCache is passed, the
+	label reports its font and width to it, and takes its height from it if
+	the text has been laid out in advance. """
+
+	def __init__(self, *args, **kwargs):
+		self.staticTextCache = kwargs.pop(u'staticTextCache', None)
+		self.textLayoutCache = kwargs.pop(u'textLayoutCache', None)
+		self._text = u''
+		super(MessageLabel, self).__init__(*args, **kwargs)
+
+	def setText(self, text):
+		""" Sets the text to display. """
+		if self.staticTextCache is None:
+			super(MessageLabel, self).setText(text)
+		else:
+			self._text = text
+			self.updateGeometry()
+			self.update()
+		if self.width() > 0:
+			self._update_maximum_height()
+
+	def text(self):
+		""" Returns the displayed text. """
+		if self.staticTextCache is None:
+			return super(MessageLabel, self).text()
+		return self._text
+
+	def _static_text(self, width):
+		return self.staticTextCache.get(self._text, self.font(), width)
+
+	def _text_size(self, width):
+		""" The size of the label when the text is wrapped at width. """
+		margins = self.contentsMargins()
+		hmargin = margins.left() + margins.right()
+		if width >= 0:
+			width = max(1, width - hmargin)
+		size = self._static_text(width).size()
+		return QtCore.QSize(int(math.ceil(size.width())) + hmargin,
+			int(math.ceil(size.height())) + margins.top() + margins.bottom())
+
+	def _hint_width(self, chars):
+		""" Width for a hint, based on the length of the unwrapped text (as
+		QLabel does for word wrapped texts). """
+		natural = self._static_text(-1).size().width()
+		return min(int(math.ceil(natural)),
+			self.fontMetrics().averageCharWidth() * chars)
+
+	def heightForWidth(self, width):
+		""" Internal QT function (do not call directly). """
+		if self.staticTextCache is not None:
+			return self._text_size(width).height()
+		if self.textLayoutCache is not None:
+			margins = self.contentsMargins()
+			height = self.textLayoutCache.height(self.text(),
+				width - margins.left() - margins.right())
+			if height is not None:
+				return height + margins.top() + margins.bottom()
+		return super(MessageLabel, self).heightForWidth(width)
+
+	def sizeHint(self):
+		""" Internal QT function (do not call directly). """
+		if self.staticTextCache is None:
+			return super(MessageLabel, self).sizeHint()
+		return self._text_size(self._hint_width(80))
+
+	def minimumSizeHint(self):
+		""" Internal QT function (do not call directly). """
+		if self.staticTextCache is None:
+			return super(MessageLabel, self).minimumSizeHint()
+		# Like QLabel: the height of the unwrapped text
+		return QtCore.QSize(self._hint_width(10),
+			self._text_size(-1).height())
+
+	def paintEvent(self, event):
+		""" Internal QT function (do not call directly). """
+		if self.staticTextCache is None:
+			super(MessageLabel, self).paintEvent(event)
+			return
+		rect = self.contentsRect()
+		text = self._static_text(rect.width())
+		painter = QtGui.QPainter(self)
+		painter.setFont(self.font())
+		painter.setPen(self.palette().color(self.foregroundRole()))
+		top = rect.top() + (rect.height() - text.size().height()) / 2
+		painter.drawStaticText(QtCore.QPointF(rect.left(), top), text)
 
 	def resizeEvent(self, event):
 		super(MessageLabel, self).resizeEvent(event)
+		if self.textLayoutCache is not None and self.wordWrap():
+			self.textLayoutCache.setGeometry(self.font(),
+				self.contentsRect().width())
+		self._update_maximum_height()
+
+	def _update_maximum_height(self):
 		if ( self.wordWrap() and \
 			self.sizePolicy().verticalPolicy() == QtWidgets.QSizePolicy.Minimum ):
 			new_height = self.heightForWidth( self.width() )
@@ -33,6 +253,14 @@ class QNotification(QtWidgets.QWidget):
 	closeClicked = QtCore.Signal()
 	""" PyQt signal for click on the notification's close button. """
 
+	timedOut = QtCore.Signal()
+	""" PyQt signal emitted when the timeout started with startTimeout() has
+	elapsed. """
+
+	expandedChanged = QtCore.Signal(bool)
+	""" PyQt signal emitted when the full text of a shortened message is shown
+	or hidden (see setExpanded()). """
+
 	def __init__(
 		self, message, category, timeout=None, autohide=False, buttontext=None,
 		*args, **kwargs
@@ -46,7 +274,28 @@ class QNotification(QtWidgets.QWidget):
 		category : {'primary', 'success', 'info', 'warning', 'danger'}
 			The type of notification. Adheres to bootstrap standard
 			classes which are {primary, success, info, warning, danger}
+		staticTextCache : StaticTextCache, optional
+			If passed, the message is painted from prepared texts kept in this
+			cache, instead of being laid out by a QLabel.
+		textLayoutCache : TextLayoutCache, optional
+			If passed, the height of the message is taken from this cache when
+			it has been computed in advance.
+		clock : QtClock or VirtualClock, optional
+			The clock that runs the timeout and the fade animations. Defaults
+			to real time.
+		maxChars : int, optional
+			The maximum number of characters of the message that is shown
+			right away. Longer messages are shortened, and can be expanded by
+			the user (see setExpanded()).
+		maxLines : int, optional
+			The maximum number of lines of the message that is shown right
+			away
 		"""
+		staticTextCache = kwargs.pop(u'staticTextCache', None)
+		textLayoutCache = kwargs.pop(u'textLayoutCache', None)
+		self.clock = kwargs.pop(u'clock', None) or default_clock
+		self.maxChars = kwargs.pop(u'maxChars', None)
+		self.maxLines = kwargs.pop(u'maxLines', None)
 		super(QNotification, self).__init__(*args, **kwargs)
 		# Store instance variables
 		self.message = message
@@ -64,7 +313,8 @@ class QNotification(QtWidgets.QWidget):
 		messageArea.setContentsMargins(0,0,0,0)
 
 		# Create the layout
-		self.message_display = MessageLabel()
+		self.message_display = MessageLabel(staticTextCache=staticTextCache,
+			textLayoutCache=textLayoutCache)
 		self.message_display.setObjectName("message")
 		self.message_display.setSizePolicy(QtWidgets.QSizePolicy.Minimum,
 			QtWidgets.QSizePolicy.Minimum)
@@ -82,8 +332,12 @@ class QNotification(QtWidgets.QWidget):
 		close_button.setObjectName("closeButton")
 		close_button.clicked.connect(self.closeClicked)
 
-		# Add everything together
-		messageArea.addWidget(self.message_display)
+		# Add everything together. The column below the message is extended
+		# by subclasses and when a long message is expanded.
+		self.messageColumn = QtWidgets.QVBoxLayout()
+		self.messageColumn.setContentsMargins(0, 0, 0, 0)
+		self.messageColumn.addWidget(self.message_display)
+		messageArea.addLayout(self.messageColumn)
 		# messageArea.addStretch(1)
 		messageArea.addWidget(close_button)
 		self.layout().addLayout(messageArea)
@@ -98,6 +352,29 @@ class QNotification(QtWidgets.QWidget):
 		# process of being removed
 		self.isBeingRemoved = False
 		self.isFadingIn = False
+		# Set if the notification closed itself because the mouse entered it
+		self.autoHidden = False
+		# The QNotificationHandle, if this notification was created by a
+		# QNotificationArea
+		self.handle = None
+		# The number of times the notification was painted, the time this
+		# took in ms, and how often the background came from the cache
+		self.paintCount = 0
+		self.paintTime = 0.0
+		self.paintCacheHits = 0
+		# Only created for messages that are shortened
+		self.expandButton = None
+		self.fullMessageView = None
+		self._elided = False
+
+		# Timer for the timeout, which can be paused (see pauseTimeout())
+		self.timeoutTimer = self.clock.createTimer(self)
+		self.timeoutTimer.setSingleShot(True)
+		self.timeoutTimer.timeout.connect(self.timedOut)
+		self._remainingTime = None
+		# The total time of the running timeout, from which the time the
+		# notification has been shown is derived (see timeoutElapsed())
+		self._timeoutDuration = None
 
 		self.__init_graphic_effects()
 
@@ -108,22 +385,195 @@ class QNotification(QtWidgets.QWidget):
 
 		# Fade in animation
 		self.fadeInAnimation = QtCore.QPropertyAnimation(self.opacityEffect,
-			safe_encode("opacity"))
+			safe_encode("opacity"), self)
 		self.fadeInAnimation.setStartValue(0.0)
 		self.fadeInAnimation.setEndValue(1.0)
 
 		# Fade out animation
 		self.fadeOutAnimation = QtCore.QPropertyAnimation(self.opacityEffect,
-			safe_encode("opacity"))
+			safe_encode("opacity"), self)
 		self.fadeOutAnimation.setStartValue(1.0)
 		self.fadeOutAnimation.setEndValue(0.0)
 
 	def display(self):
 		""" Displays the notification. """
-		self.message_display.setText(self.message)
+		self._show_message(self.message)
 		self.show()
 		self.raise_()
 
+	def setMessage(self, message):
+		""" Changes the message of the notification, also when it is shown.
+
+		Parameters
+		----------
+		message : str
+			The new message
+		"""
+		self.message = message
+		self._show_message(message)
+
+	def _show_message(self, message):
+		""" Shows message, shortened to maxChars and maxLines. """
+		preview, self._elided = elide_message(message, self.maxChars,
+			self.maxLines)
+		self.message_display.setText(preview)
+		if self._elided and self.expandButton is None:
+			self.expandButton = QtWidgets.QPushButton(u'Show all')
+			self.expandButton.setObjectName(u'expandButton')
+			self.expandButton.setFlat(True)
+			self.expandButton.setStyleSheet(u'text-decoration: underline;')
+			self.expandButton.clicked.connect(self.toggleExpanded)
+			self.messageColumn.insertWidget(
+				self.messageColumn.indexOf(self.message_display) + 1,
+				self.expandButton, 0, QtCore.Qt.AlignLeft)
+		if self.expandButton is not None:
+			self.expandButton.setVisible(self._elided)
+		if self.fullMessageView is not None:
+			if self._elided:
+				self.fullMessageView.setPlainText(message)
+			else:
+				self.setExpanded(False)
+
+	def isExpanded(self):
+		""" Returns True if the full text of a shortened message is shown. """
+		return self.fullMessageView is not None
+
+	def setExpanded(self, expanded):
+		""" Shows the full text of a shortened message, or the shortened
+		message again. The full text is shown in a scrollable view, which
+		only lays out the lines that are visible. It is created when it is
+		needed, and destroyed when the message is collapsed again. While the
+		full text is shown, the timeout is paused (by the manager of the
+		area, if it has one).
+
+		Parameters
+		----------
+		expanded : bool
+			Whether to show the full text
+		"""
+		if expanded and not self._elided:
+			return
+		if expanded == self.isExpanded():
+			return
+		if expanded:
+			view = QtWidgets.QPlainTextEdit()
+			view.setObjectName(u'fullMessage')
+			view.setReadOnly(True)
+			view.setFrameShape(QtWidgets.QFrame.NoFrame)
+			view.setFixedHeight(EXPANDED_HEIGHT)
+			view.setPlainText(self.message)
+			self.messageColumn.insertWidget(
+				self.messageColumn.indexOf(self.message_display) + 1, view)
+			self.message_display.hide()
+			self.fullMessageView = view
+			self.expandButton.setText(u'Show less')
+			self.pauseTimeout()
+		else:
+			self.messageColumn.removeWidget(self.fullMessageView)
+			self.fullMessageView.hide()
+			self.fullMessageView.deleteLater()
+			self.fullMessageView = None
+			self.message_display.show()
+			self.expandButton.setText(u'Show all')
+			self.resumeTimeout()
+		self.expandedChanged.emit(expanded)
+
+	def toggleExpanded(self):
+		""" Expands a shortened message, or collapses it again. """
+		self.setExpanded(not self.isExpanded())
+
+	def setCategory(self, category):
+		""" Changes the category of the notification, also when it is shown.
+
+		Parameters
+		----------
+		category : {'primary', 'success', 'info', 'warning', 'danger'}
+			The new category
+
+		Raises
+		------
+		ValueError
+			if the category is other than one of the expected values.
+		"""
+		self.category = category
+		self.setObjectName(category)
+		# Style sheet rules are matched by object name, so they have to be
+		# applied again.
+		self.style().unpolish(self)
+		self.style().polish(self)
+		self.update()
+
+	def startTimeout(self, timeout=None):
+		""" Starts the timer after which timedOut is emitted.
+
+		Parameters
+		----------
+		timeout : int, optional
+			The time in ms. Defaults to the timeout of the notification. If
+			this is None or 0, no timer is started.
+		"""
+		if timeout is None:
+			timeout = self.timeout
+		self._remainingTime = None
+		if not timeout:
+			self._timeoutDuration = None
+			self.timeoutTimer.stop()
+			return
+		self._timeoutDuration = timeout
+		self.timeoutTimer.start(timeout)
+
+	def setTimeoutDuration(self, timeout):
+		""" Changes the total time of the running or paused timeout, keeping
+		the time that has already elapsed. If that time is already over, the
+		timeout expires as soon as possible.
+
+		Parameters
+		----------
+		timeout : int
+			The new total time in ms
+		"""
+		elapsed = self.timeoutElapsed()
+		if elapsed is None:
+			return
+		self._timeoutDuration = timeout
+		remaining = max(0, int(timeout - elapsed))
+		if self._remainingTime is not None:
+			self._remainingTime = remaining
+		else:
+			self.timeoutTimer.start(remaining)
+
+	def timeoutElapsed(self):
+		""" Returns the time in ms that has elapsed of the running or paused
+		timeout, or None if there is no timeout. """
+		if self._timeoutDuration is None:
+			return None
+		if self._remainingTime is not None:
+			remaining = self._remainingTime
+		elif self.timeoutTimer.isActive():
+			remaining = max(0, self.timeoutTimer.remainingTime())
+		else:
+			return None
+		return self._timeoutDuration - remaining
+
+	def pauseTimeout(self):
+		""" Stops the timeout timer, keeping the time that remains. """
+		if self.timeoutTimer.isActive():
+			self._remainingTime = max(0, self.timeoutTimer.remainingTime())
+			self.timeoutTimer.stop()
+
+	def resumeTimeout(self):
+		""" Restarts the timeout timer with the time that remained when it was
+		paused. """
+		if self._remainingTime is not None:
+			self.timeoutTimer.start(self._remainingTime)
+			self._remainingTime = None
+
+	def finishAnimations(self):
+		""" Jumps to the end of running fade animations. """
+		for animation in (self.fadeInAnimation, self.fadeOutAnimation):
+			if animation.state() != QtCore.QAbstractAnimation.Stopped:
+				animation.setCurrentTime(animation.duration())
+
 	def close(self):
 		""" Closes the notification. """
 		super(QNotification,self).close()
@@ -150,7 +600,7 @@ class QNotification(QtWidgets.QWidget):
 		self.isFadingIn = True
 		self.fadeInAnimation.finished.connect(self.onFadeInFinished)
 		self.display()
-		self.fadeInAnimation.start()
+		self.clock.startAnimation(self.fadeInAnimation)
 
 	def onFadeInFinished(self):
 
@@ -186,16 +636,19 @@ class QNotification(QtWidgets.QWidget):
 		self.fadeOutAnimation.setDuration(duration)
 		self.fadeOutAnimation.finished.connect(lambda: finishedCallback(self))
 		self.isBeingRemoved = True
-		self.fadeOutAnimation.start()
+		self.clock.startAnimation(self.fadeOutAnimation)
 
 	def paintEvent(self, pe):
 		""" redefinition of paintEvent, do not call directly.
 		Makes class QNotification available in style sheets. Interal Qt function.
 		Should not be called directly. """
-		o = QtWidgets.QStyleOption()
-		o.initFrom(self)
+		start = default_timer()
 		p = QtGui.QPainter(self)
-		self.style().drawPrimitive(QtWidgets.QStyle.PE_Widget, o, p, self)
+		if paint_background(self, p):
+			self.paintCacheHits += 1
+		p.end()
+		self.paintCount += 1
+		self.paintTime += (default_timer() - start) * 1000
 
 	### Property attributes
 	@property
@@ -228,10 +681,7 @@ class QNotification(QtWidgets.QWidget):
 			if the category is other than one of the expected values.
 		"""
 
-		allowed_values = ['primary','success','info','warning','danger']
-		if not value in allowed_values:
-			raise ValueError(u'\"{}\" is not a valid value. '
-				'Should be one of {}'.format(value, str(allowed_values)))
+		check_category(value)
 		self._category = value
 
 	def enterEvent(self, e):
@@ -241,4 +691,5 @@ class QNotification(QtWidgets.QWidget):
 		"""
 
 		if self.autohide:
+			self.autoHidden = True
 			self.closeClicked.emit()
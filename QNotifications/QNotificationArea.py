@@ -5,18 +5,27 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import functools
+import heapq
+import itertools
+import sys
+import weakref
+from timeit import default_timer
+
 from qtpy import QtWidgets, QtCore, QtGui
-from QNotifications.QNotification import QNotification
+from QNotifications.QNotification import QNotification, check_category, \
+	preview_message
+from QNotifications.QNotificationHandle import QNotificationHandle, \
+	OUTCOME_CLICKED, OUTCOME_DISMISSED, OUTCOME_TIMED_OUT, OUTCOME_DROPPED, \
+	OUTCOME_REPLACED, OUTCOME_EXPIRED, _UNCHANGED
+from QNotifications.QNotificationHistory import QNotificationHistory
+from QNotifications.QProgressNotification import QProgressNotification, \
+	QProgressHandle
+from QNotifications.textcache import static_text_cache, TextLayoutCache
+from QNotifications.clock import default_clock
 from QNotifications.abstractions import *
 
-try:
-	# Python 3
-	from queue import Queue, Empty
-except:
-	# Python 2
-	from Queue import Queue, Empty
-
-
 __author__ = u"Daniel Schreij"
 __license__ = u"GPLv3"
 
@@ -26,11 +35,82 @@ CURSOR_MARGIN_BOTTOM = 50
 CURSOR_MARGIN_LEFT = 10
 CURSOR_MARGIN_RIGHT = 10
 
+# Animation modes (see QNotificationArea.setAdaptiveAnimations())
+ANIMATION_FULL = u'full'
+ANIMATION_REDUCED = u'reduced'
+ANIMATION_OFF = u'off'
+# The interval (in ms) at which the event loop lag is measured
+LOAD_PROBE_INTERVAL = 100
+# The interval (in ms) at which Qt advances animations
+ANIMATION_FRAME_INTERVAL = 16
+# The interval (in ms) at which expired notifications are removed from the
+# queue
+TTL_SWEEP_INTERVAL = 1000
+# The minimum times (in ms) for which notifications are shown when their
+# timeouts are shortened to meet a latency target (see
+# QNotificationArea.setLatencyTarget()). The timeouts of categories that are
+# not listed are never shortened.
+LATENCY_FLOORS = {
+	u'primary': 2000,
+	u'info': 1500,
+	u'success': 1500,
+	u'warning': 3000,
+}
+# The interval (in ms) at which timeouts are adjusted to the latency target
+LATENCY_CONTROL_INTERVAL = 250
+# The number of queued notifications for which the latency control simulates
+# the queue. The delays of the notifications behind them are estimated.
+LATENCY_SIMULATION_LIMIT = 500
+# Rough sizes (in bytes) of a widget, with its private data and style, and of
+# any other QObject, used by QNotificationArea.resourceUsage()
+WIDGET_BYTES_ESTIMATE = 2048
+QOBJECT_BYTES_ESTIMATE = 256
+# The number of history entries that is measured to estimate the size of the
+# whole history
+HISTORY_SAMPLE_SIZE = 64
+
+
+def _history_bytes(history):
+	""" Estimates the memory held by the entries of a history, from the most
+	recent ones. """
+	count = len(history)
+	if not count:
+		return 0
+	size = 0
+	sample = min(count, HISTORY_SAMPLE_SIZE)
+	for seq in range(history.lastSeq - sample + 1, history.lastSeq + 1):
+		entry = history._entries[seq - history.firstSeq]
+		size += sys.getsizeof(entry) + sys.getsizeof(entry[0]) + \
+			sys.getsizeof(entry[2])
+	return size * count // sample
+
+
+def _drop_handles(handles, *args):
+	""" Resolves the handles of notifications that are still queued or shown
+	when their notification area is destroyed. """
+	for handle in list(handles.values()):
+		handle._resolve(OUTCOME_DROPPED)
+	handles.clear()
+
 
 class QNotificationArea(QtWidgets.QWidget):
 	""" Notification area to show notifications in. Will be projected on top of
 	another QWidget which should be passed as an argument to this class. """
 
+	animationModeChanged = QtCore.Signal('QString')
+	""" PyQt signal emitted with the new mode (ANIMATION_FULL,
+	ANIMATION_REDUCED or ANIMATION_OFF) when adaptive animations change the
+	animation mode. """
+
+	# All areas, for totalResourceUsage()
+	_areas = weakref.WeakSet()
+
+	latencyTargetMissed = QtCore.Signal(int)
+	""" PyQt signal emitted with the predicted delay (in ms) beyond the target
+	when the latency target set with setLatencyTarget() cannot be met, even
+	with the shortest timeouts allowed. It is emitted again only after the
+	target has been met in the meantime. """
+
 	default_notification_styles = u"""
 	QNotification {
 		font-size: 16px;
@@ -52,6 +132,19 @@ class QNotificationArea(QtWidgets.QWidget):
 		margin: 0px;
 	}
 
+	QNotification #expandButton{
+		color: #FFFFFF;
+		font-size: 13px;
+		padding: 0px;
+		margin: 0px;
+	}
+
+	QNotification #fullMessage{
+		color: #FFFFFF;
+		background-color: transparent;
+		font-size: 13px;
+	}
+
 	QNotification#primary {
 		background-color: #337ab7;
 		border-color: #2e6da4;
@@ -95,7 +188,47 @@ class QNotificationArea(QtWidgets.QWidget):
 			queue. Once a message disappears, the next one in the queue will be shown
 			(up to maxMessages at the same time)
 		maxMessages : int (default: 2)
-			The number of messages to display at the same time.
+			The number of messages to display at the same time (unless a height
+			limit is set, see setHeightLimit()).
+		history : QNotificationHistory or False, optional
+			The history in which displayed notifications are recorded. Pass the
+			same object to several areas to share a history between them. If
+			not provided, a new history is created. If False, notifications
+			are not recorded.
+		historySize : int or None (default: 100000)
+			The maximum number of entries of the history that is created when
+			no history is passed. If 0, notifications are not recorded.
+		manager : QNotificationManager, optional
+			The manager to hand notifications to. The manager then decides when
+			notifications are shown, and the area uses the history of the
+			manager (unless a history is passed).
+		useStaticText : bool (default: False)
+			If True, messages are painted from prepared QStaticText objects,
+			which are kept in a cache that is shared by all areas. Messages
+			that are shown repeatedly then do not need to be laid out again.
+		frameBudget : int or None (default: None)
+			See setFrameBudget()
+		preLayout : bool (default: False)
+			If True, the heights of queued messages are computed in a worker
+			thread while they wait, so that showing them is cheaper. The results
+			are discarded when the width of the area changes.
+		autoSuspend : bool (default: False)
+			If True, the area is suspended (see suspend()) while targetWidget is
+			hidden or its window is minimized, and resumed when it is shown
+			again.
+		ttl : int or None (default: None)
+			The default time to live (in ms) of queued notifications (see
+			display())
+		maxChars : int or None (default: 2000)
+			Messages that are longer are shortened when they are shown, with
+			a button to expand them to their full text
+		maxLines : int or None (default: 20)
+			Messages with more lines are shortened in the same way
+		clock : QtClock or VirtualClock, optional
+			The clock that runs the timeouts, times to live, latency control
+			and effects of the area. Defaults to the clock of the manager, or
+			to real time. Pass a VirtualClock to control time in tests (see
+			QNotifications.clock).
 
 		Raises
 		------
@@ -109,6 +242,24 @@ class QNotificationArea(QtWidgets.QWidget):
 		useGlobalCSS = kwargs.pop(u'useGlobalCSS', False)
 		self.useQueue = kwargs.pop(u'useQueue', True)
 		self.maxMessages = kwargs.pop(u'maxMessages', 2)
+		history = kwargs.pop(u'history', None)
+		historySize = kwargs.pop(u'historySize', 100000)
+		self.manager = kwargs.pop(u'manager', None)
+		frameBudget = kwargs.pop(u'frameBudget', None)
+		preLayout = kwargs.pop(u'preLayout', False)
+		autoSuspend = kwargs.pop(u'autoSuspend', False)
+		self.ttl = kwargs.pop(u'ttl', None)
+		self.maxChars = kwargs.pop(u'maxChars', 2000)
+		self.maxLines = kwargs.pop(u'maxLines', 20)
+		clock = kwargs.pop(u'clock', None)
+		if clock is None:
+			clock = default_clock if self.manager is None else \
+				self.manager.clock
+		self.clock = clock
+		if kwargs.pop(u'useStaticText', False):
+			self.staticTextCache = static_text_cache
+		else:
+			self.staticTextCache = None
 
 		super(QNotificationArea, self).__init__(*args, **kwargs)
 
@@ -116,7 +267,39 @@ class QNotificationArea(QtWidgets.QWidget):
 			self.setStyleSheet(self.default_notification_styles)
 
 		if self.useQueue:
-			self.queue = Queue()
+			# Queued handles in order of arrival, keyed by their sequence number
+			# (handle._seq), so that a queued notification can be removed or
+			# replaced without searching the queue.
+			self.queue = collections.OrderedDict()
+			self._queueSeq = itertools.count()
+		# Expiry of queued notifications
+		self._expired = 0
+		self._ttlSweep = clock.createTimer(self)
+		self._ttlSweep.setInterval(TTL_SWEEP_INTERVAL)
+		self._ttlSweep.timeout.connect(self._sweep_expired)
+		# Latency target
+		self.latencyTarget = None
+		self.latencyFloors = dict(LATENCY_FLOORS)
+		self._timeoutScale = 1.0
+		self._latencyMet = True
+		self._queueLatency = None
+		self._latencyControl = clock.createTimer(self)
+		self._latencyControl.setInterval(LATENCY_CONTROL_INTERVAL)
+		self._latencyControl.timeout.connect(self._control_latency)
+
+		if history is None and self.manager is not None:
+			history = self.manager.history
+		if history is False:
+			history = QNotificationHistory(0, self)
+		elif history is None:
+			history = QNotificationHistory(historySize, self)
+		self.history = history
+
+		# Handles of notifications that are queued or shown, by id
+		self._handles = {}
+		# Widgets of the notifications that are shown, by handle id
+		self._visible = {}
+		self.destroyed.connect(functools.partial(_drop_handles, self._handles))
 
 		self.setParent(targetWidget)
 		self.targetWidget = targetWidget
@@ -125,12 +308,63 @@ class QNotificationArea(QtWidgets.QWidget):
 		notification_area_layout = QtWidgets.QVBoxLayout()
 		self.setLayout(notification_area_layout)
 
+		if preLayout:
+			self.textLayoutCache = TextLayoutCache(self._queued_messages,
+				preview=functools.partial(preview_message,
+				maxChars=self.maxChars, maxLines=self.maxLines))
+			self.destroyed.connect(self.textLayoutCache.close)
+		else:
+			self.textLayoutCache = None
+
+		# Notifications that are to be shown, but for which no widget has been
+		# created yet (see setFrameBudget())
+		self.frameBudget = None
+		self.heightLimit = None
+		self._recorder = None
+		# The height of a notification, as last measured
+		self._averageHeight = None
+		self.autoSuspend = autoSuspend
+		self._suspended = False
+		self._suspendWindow = None
+		self._pending = collections.deque()
+		self._materializeScheduled = False
+		self.setFrameBudget(frameBudget)
+
+		if autoSuspend:
+			targetWidget.installEventFilter(self)
+			if targetWidget.window() is not targetWidget:
+				targetWidget.window().installEventFilter(self)
+			self._update_suspended()
+
 		# Init effects to None
 		self.entryEffect = None
 		self.entryEffectDuration = None
 		self.exitEffect = None
 		self.exitEffectDuration = None
 
+		# Adaptive animations
+		self.adaptiveAnimations = False
+		self.animationLoadThreshold = 40
+		self.animationMode = ANIMATION_FULL
+		self._eventLoopLag = 0.0
+		self._frameOverrun = 0.0
+		self._frameSamples = []
+		self._lastFrame = None
+		# The load of the application is measured in real time, whatever the
+		# clock of the area.
+		self._loadClock = QtCore.QElapsedTimer()
+		self._loadClock.start()
+		self._lastProbe = 0
+		self._loadProbe = QtCore.QTimer(self)
+		self._loadProbe.setTimerType(QtCore.Qt.PreciseTimer)
+		self._loadProbe.setInterval(LOAD_PROBE_INTERVAL)
+		self._loadProbe.timeout.connect(self._measure_load)
+		# Paints of the area and of its notifications that have been removed
+		# (see stats())
+		self._paintCount = 0
+		self._paintTime = 0.0
+		self._paintCacheHits = 0
+
 		# Store original target classes resizeEvent to be called in our own
 		# function
 		self.target_resize_event = targetWidget.resizeEvent
@@ -139,24 +373,478 @@ class QNotificationArea(QtWidgets.QWidget):
 		self.targetWidget.resizeEvent = self.resizeEvent
 		self.hide()
 
+		if self.manager is not None:
+			self.manager.register(self)
+		QNotificationArea._areas.add(self)
+
 	def __delete_notification(self, notification=None):
 		""" Closes and destroys the supplied notification. """
 		notification.close()
 		self.layout().removeWidget(notification)
+		self._visible.pop(notification.handle.id, None)
+		self._paintCount += notification.paintCount
+		self._paintTime += notification.paintTime
+		self._paintCacheHits += notification.paintCacheHits
 
 		self.adjustSize()
 		# Hide notification area if it doesn't contain any items
 		if self.layout().count() == 0:
 			self.hide()
+			self._loadProbe.stop()
 
-		if self.useQueue:
-			try:
-				notification = self.queue.get(False)
-				self._show_notification(notification)
-			except Empty:
-				pass
+		self._admit()
+
+	def _show_next(self):
+		""" Shows the next queued notification that has not expired. """
+		now = self.clock.elapsed()
+		while self.queue:
+			seq, handle = self.queue.popitem(last=False)
+			if handle.expiresAt is not None and handle.expiresAt <= now:
+				self._expire(handle)
+				continue
+			self._show_notification(handle)
+			return
+
+	def _expire(self, handle):
+		self._expired += 1
+		self._resolve(handle, OUTCOME_EXPIRED)
+
+	def _sweep_expired(self):
+		""" Discards queued notifications that have expired. """
+		now = self.clock.elapsed()
+		for handle in list(self.queue.values()):
+			if handle.expiresAt is not None and handle.expiresAt <= now:
+				self._expire(handle)
+		if not self.queue:
+			self._ttlSweep.stop()
+
+	def _resolve(self, handle, outcome):
+		""" Sets the outcome of the notification referred to by handle. """
+		if handle is None:
+			return
+		if self.manager is not None:
+			self.manager._resolve(handle, outcome)
+			return
+		self._handles.pop(handle.id, None)
+		if self.useQueue and self.queue.get(handle._seq) is handle:
+			del self.queue[handle._seq]
+		handle._resolve(outcome)
+
+	def _shown_count(self):
+		""" The number of notifications that are shown, or are about to be
+		shown. """
+		return self.layout().count() + len(self._pending)
+
+	def _queued_messages(self):
+		""" The messages of the notifications that are waiting to be shown. """
+		if not self.useQueue:
+			return []
+		return [handle.message for handle in self.queue.values()]
+
+	def _has_room(self):
+		""" Whether another notification can be shown without queueing it. """
+		if self._suspended:
+			return False
+		if not self.useQueue:
+			return True
+		count = self._shown_count()
+		if self.heightLimit is None:
+			return count < self.maxMessages
+		if count == 0:
+			return True
+		# Notifications that are waiting for the frame budget have no height
+		# yet, so all notifications are assumed to be of average height.
+		shown = self.layout().count()
+		if shown:
+			self._averageHeight = self.height() / shown
+		elif self._averageHeight is None:
+			# A guess for a notification with a single line of text
+			self._averageHeight = 3 * self.fontMetrics().lineSpacing()
+		return (count + 1) * self._averageHeight <= \
+			self.heightLimit * self._available_height()
+
+	def _available_height(self):
+		""" The height that setHeightLimit() takes a fraction of. """
+		return self.targetWidget.height()
+
+	def _admit(self):
+		""" Shows queued notifications while there is room for them. """
+		if self.manager is not None:
+			self.manager._dispatch()
+		elif self.useQueue:
+			while self._has_room() and self.queue:
+				self._show_next()
+
+	def _notifications(self):
+		""" The notifications that are currently shown. """
+		layout = self.layout()
+		return [layout.itemAt(i).widget() for i in range(layout.count())]
 
 	# Public functions
+	def setFrameBudget(self, budget):
+		""" Limits the time spent on creating and showing notifications per
+		pass of the event loop. When many notifications are displayed at once,
+		their widgets are then created in chunks that take at most budget ms
+		each, and the event loop can handle input in between. Notifications
+		are still accepted immediately.
+
+		Parameters
+		----------
+		budget : int or None
+			The time budget in milliseconds, or None to create and show
+			notifications right away (the default).
+
+		Raises
+		------
+		TypeError
+			If budget is not an int or None
+		ValueError
+			If budget is less than 1
+		"""
+		if budget is not None:
+			if not isinstance(budget, int):
+				raise TypeError(u'Budget should be an int')
+			if budget < 1:
+				raise ValueError(u'Budget should be at least 1 ms')
+		self.frameBudget = budget
+		if budget is None:
+			# Show what was waiting right away
+			self._materialize()
+
+	def startRecording(self, path):
+		""" Records the calls to display(), replace(), updateNotification()
+		and remove() of this area, with their times and arguments, to a file.
+		Removals by the user (by clicking a notification) are recorded too.
+		The recording can be replayed with QNotifications.recording. A
+		recording that is already running is stopped.
+
+		Parameters
+		----------
+		path : str
+			The file to record to. An existing file is overwritten.
+		"""
+		from QNotifications.recording import QNotificationRecorder
+		self.stopRecording()
+		self._recorder = QNotificationRecorder(path, {
+			u'useQueue': self.useQueue,
+			u'maxMessages': self.maxMessages,
+			u'ttl': self.ttl,
+		}, self.clock)
+
+	def stopRecording(self):
+		""" Stops recording and closes the file. """
+		if self._recorder is not None:
+			self._recorder.close()
+			self._recorder = None
+
+	def setHeightLimit(self, fraction):
+		""" Lets the number of notifications that is shown at the same time
+		depend on the space they take up, instead of on maxMessages. Queued
+		notifications are then shown as long as all notifications fit within a
+		fraction of the height of targetWidget (but at least one notification
+		is always shown). Heights are estimated from the notifications that
+		are shown, and more notifications are admitted when targetWidget
+		becomes taller.
+
+		Parameters
+		----------
+		fraction : float or None
+			The fraction of the height of targetWidget that notifications may
+			cover, or None to show at most maxMessages notifications (the
+			default).
+
+		Raises
+		------
+		ValueError
+			If fraction is not between 0 and 1
+		"""
+		if fraction is not None and not 0 < fraction <= 1:
+			raise ValueError(u'The fraction should be between 0 and 1')
+		self.heightLimit = fraction
+		if fraction is not None:
+			self.targetWidget.installEventFilter(self)
+			self._admit()
+
+	def setLatencyTarget(self, maxWait, floors=None):
+		""" Shortens the timeouts of notifications when the queue grows, so
+		that queued notifications are shown within maxWait ms after they were
+		displayed. All timeouts are scaled by the same factor, which is
+		adjusted continuously, but never below the minimum display time of
+		their category. The timeouts of categories without a minimum (by
+		default 'danger') are never shortened. If the target cannot be met,
+		latencyTargetMissed is emitted. Only applies to areas without a
+		manager.
+
+		Parameters
+		----------
+		maxWait : int or None
+			The maximum time in ms that notifications should wait in the queue,
+			or None to always use the full timeouts (the default).
+		floors : dict, optional
+			The minimum display times in ms by category. Defaults to
+			LATENCY_FLOORS.
+		"""
+		self.latencyTarget = maxWait
+		self.latencyFloors = dict(LATENCY_FLOORS if floors is None else floors)
+		self._timeoutScale = 1.0
+		self._latencyMet = True
+		if maxWait is None:
+			self._latencyControl.stop()
+		else:
+			self._latencyControl.start()
+			self._control_latency()
+
+	def _scaled_timeout(self, handle, scale):
+		""" The timeout of handle, shortened by scale down to its floor. """
+		timeout = handle.timeout
+		floor = self.latencyFloors.get(handle.category)
+		if not timeout or floor is None or scale >= 1:
+			return timeout
+		return max(min(floor, timeout), int(timeout * scale))
+
+	def _predicted_delay(self, scale, shown, now, target):
+		""" Simulates the queue with timeouts shortened by scale, and returns
+		the largest delay in ms by which a queued notification misses the
+		target (or a negative number if the target is met). Only the first
+		LATENCY_SIMULATION_LIMIT queued notifications are simulated, the start
+		times of the others are extrapolated from them. """
+		slots = []
+		for handle, remaining, elapsed in shown:
+			timeout = self._scaled_timeout(handle, scale)
+			if timeout:
+				remaining = min(remaining, max(0, timeout - elapsed))
+			slots.append(remaining)
+		if self.heightLimit is None:
+			slots += [0] * (self.maxMessages - len(slots))
+		if not slots:
+			slots.append(0)
+		heapq.heapify(slots)
+		delay = float(u'-inf')
+		total = 0
+		for handle in itertools.islice(self.queue.values(),
+			LATENCY_SIMULATION_LIMIT):
+			start = heapq.heappop(slots)
+			delay = max(delay, start - (target - (now - handle.queuedAt)))
+			timeout = self._scaled_timeout(handle, scale)
+			timeout = timeout if timeout else float(u'inf')
+			total += timeout
+			heapq.heappush(slots, start + timeout)
+		tail = len(self.queue) - LATENCY_SIMULATION_LIMIT
+		if tail <= 0:
+			return delay
+		# The slots are taken in turn, each for the average timeout
+		step = total / LATENCY_SIMULATION_LIMIT / len(slots)
+		first = next(itertools.islice(self.queue.values(),
+			LATENCY_SIMULATION_LIMIT, None))
+		last = next(reversed(self.queue.values()))
+		for handle, index in ((first, 0), (last, tail - 1)):
+			start = slots[0] + index * step
+			delay = max(delay, start - (target - (now - handle.queuedAt)))
+		return delay
+
+	def _control_latency(self):
+		""" Chooses the largest timeout scale with which the latency target is
+		met, and applies it to the notifications that are shown. """
+		if self.latencyTarget is None or self.manager is not None or \
+			self._suspended:
+			return
+		if not self.useQueue or not self.queue:
+			self._latencyControl.stop()
+			self._timeoutScale = 1.0
+			self._latencyMet = True
+			return
+		now = self.clock.elapsed()
+		# (handle, remaining time, time shown) of the notifications that are
+		# shown or about to be shown
+		shown = []
+		notifications = []
+		for notification in self._notifications():
+			if notification.isBeingRemoved:
+				continue
+			elapsed = notification.timeoutElapsed()
+			if elapsed is None:
+				shown.append((notification.handle, float(u'inf'), 0))
+				continue
+			remaining = notification._timeoutDuration - elapsed
+			shown.append((notification.handle, remaining, elapsed))
+			notifications.append(notification)
+		for handle in self._pending:
+			shown.append((handle, handle.timeout or float(u'inf'), 0))
+		target = self.latencyTarget
+		if self._predicted_delay(1.0, shown, now, target) <= 0:
+			scale = 1.0
+		else:
+			delay = self._predicted_delay(0.0, shown, now, target)
+			if delay > 0:
+				scale = 0.0
+				if self._latencyMet:
+					self.latencyTargetMissed.emit(min(int(delay), 2**31 - 1))
+			else:
+				low, high = 0.0, 1.0
+				for i in range(8):
+					mid = (low + high) / 2
+					if self._predicted_delay(mid, shown, now, target) <= 0:
+						low = mid
+					else:
+						high = mid
+				scale = low
+			self._latencyMet = delay <= 0
+		if scale >= 1:
+			self._latencyMet = True
+		self._timeoutScale = scale
+		# Shortened timeouts count from when the notification was shown, so
+		# that it is still shown for at least the floor of its category.
+		for notification in notifications:
+			timeout = self._scaled_timeout(notification.handle, scale)
+			if timeout and notification.timeoutTimer.isActive() and \
+				timeout < notification._timeoutDuration:
+				notification.setTimeoutDuration(timeout)
+
+	def suspend(self):
+		""" Suspends the area: timeouts of shown notifications are frozen,
+		running animations are finished, and new notifications are held back
+		until resume() is called. """
+		if self._suspended:
+			return
+		self._suspended = True
+		for notification in self._notifications():
+			notification.finishAnimations()
+			notification.pauseTimeout()
+		if self.manager is not None:
+			self.manager._on_area_suspended(self)
+
+	def resume(self):
+		""" Resumes a suspended area. Frozen timeouts continue with the time
+		they had left, and notifications that were held back are shown in one
+		go. """
+		if not self._suspended:
+			return
+		self._suspended = False
+		for notification in self._notifications():
+			# Expanded notifications stay paused until they are collapsed
+			if not notification.isExpanded():
+				notification.resumeTimeout()
+		self._materialize()
+		if self.manager is not None:
+			self.manager._on_area_resumed(self)
+		self._admit()
+
+	def isSuspended(self):
+		""" Returns True if the area is suspended. """
+		return self._suspended
+
+	def _update_suspended(self):
+		""" Suspends or resumes the area, depending on whether the target
+		widget can be seen. """
+		window = self.targetWidget.window()
+		handle = window.windowHandle()
+		if handle is not None and handle is not self._suspendWindow:
+			# The window is exposed or obscured without the widgets being
+			# notified, so watch the QWindow too.
+			handle.installEventFilter(self)
+			self._suspendWindow = handle
+		hidden = not self.targetWidget.isVisible() or window.isMinimized() or \
+			(handle is not None and not handle.isExposed())
+		if hidden:
+			self.suspend()
+		else:
+			self.resume()
+
+	def setAdaptiveAnimations(self, enabled, threshold=40):
+		""" Lets the area shorten or skip the entry and exit effects when the
+		application is under load. While notifications are shown, the area
+		measures how late the event loop handles a timer, and how far apart the
+		frames of running animations are. If this exceeds threshold, effects
+		are shortened to a quarter of their duration, and above twice the
+		threshold they are skipped altogether. They are restored once the load
+		has dropped below half of the threshold. Changes are reported through
+		animationModeChanged.
+
+		Parameters
+		----------
+		enabled : bool
+			Whether to adapt the animations
+		threshold : int (default: 40)
+			The delay in ms above which animations are shortened
+
+		Raises
+		------
+		ValueError
+			If threshold is less than 1
+		"""
+		if threshold < 1:
+			raise ValueError(u'Threshold should be at least 1 ms')
+		self.adaptiveAnimations = enabled
+		self.animationLoadThreshold = threshold
+		if not enabled:
+			self._loadProbe.stop()
+			self._set_animation_mode(ANIMATION_FULL)
+		elif self.layout().count():
+			self._start_load_probe()
+
+	def _start_load_probe(self):
+		if not self._loadProbe.isActive():
+			self._lastProbe = self._loadClock.elapsed()
+			self._lastFrame = None
+			self._frameSamples = []
+			self._loadProbe.start()
+
+	def _on_animation_frame(self):
+		""" Records the interval between animation frames. """
+		now = self._loadClock.elapsed()
+		if self._lastFrame is not None:
+			interval = now - self._lastFrame
+			# Several animations are advanced in the same frame
+			if interval >= 2:
+				self._frameSamples.append(interval)
+		self._lastFrame = now
+
+	def _measure_load(self):
+		now = self._loadClock.elapsed()
+		lag = max(0, now - self._lastProbe - LOAD_PROBE_INTERVAL)
+		self._lastProbe = now
+		if self._frameSamples:
+			overrun = max(0, sum(self._frameSamples) / len(self._frameSamples) \
+				- ANIMATION_FRAME_INTERVAL)
+		else:
+			# No animation running
+			overrun = 0
+			self._lastFrame = None
+		self._frameSamples = []
+		# Peaks are held and decay slowly, so that the mode does not flip back
+		# and forth when the load is irregular.
+		self._eventLoopLag = max(lag, 0.8 * self._eventLoopLag)
+		self._frameOverrun = max(overrun, 0.8 * self._frameOverrun)
+		load = max(self._eventLoopLag, self._frameOverrun)
+		threshold = self.animationLoadThreshold
+		if load > 2 * threshold:
+			self._set_animation_mode(ANIMATION_OFF)
+		elif load > threshold:
+			if self.animationMode == ANIMATION_FULL:
+				self._set_animation_mode(ANIMATION_REDUCED)
+		elif load < threshold / 2:
+			self._set_animation_mode(ANIMATION_FULL)
+		elif self.animationMode == ANIMATION_OFF:
+			self._set_animation_mode(ANIMATION_REDUCED)
+
+	def _set_animation_mode(self, mode):
+		if mode == self.animationMode:
+			return
+		self.animationMode = mode
+		if mode == ANIMATION_OFF:
+			for notification in self._notifications():
+				notification.finishAnimations()
+		self.animationModeChanged.emit(mode)
+
+	def _effect_duration(self, duration):
+		""" The duration of an effect in the current animation mode, or None
+		if it should be skipped. """
+		if self.animationMode == ANIMATION_OFF or self._suspended:
+			return None
+		if self.animationMode == ANIMATION_REDUCED:
+			return max(1, duration // 4)
+		return duration
+
 	def setEntryEffect(self, effect, duration=250):
 		""" Sets the effect with which the notifications are to appear.
 
@@ -219,7 +907,8 @@ class QNotificationArea(QtWidgets.QWidget):
 
 	@QtCore.Slot('QString', 'QString', int, bool)
 	@QtCore.Slot('QString', 'QString', int, bool, 'QString')
-	def display(self, message, category, timeout=5000, autohide=False, buttontext=None):
+	def display(self, message, category, timeout=5000, autohide=False,
+		buttontext=None, ttl=None):
 		""" Displays a notification.
 
 		If a queue is used, then the notification will only be shown directly
@@ -227,8 +916,11 @@ class QNotificationArea(QtWidgets.QWidget):
 
 		Parameters
 		----------
-		message : str
-			The message to display
+		message : str, bytes or memoryview
+			The message to display. UTF-8 bytes (for instance read from a
+			socket) are only decoded once the notification is shown, so
+			notifications that are dropped, replaced or expire while queued
+			are never decoded. Invalid bytes are shown as U+FFFD.
 		category : {'primary', 'success', 'info', 'warning', 'danger'}
 			The type of notification that should be shown. Adheres to bootstrap
 			standards which are primary, success, info, warning and danger
@@ -238,21 +930,192 @@ class QNotificationArea(QtWidgets.QWidget):
 		buttontext : str, optional
 			The text to display on the closing button. If not provided a cross
 			will be shown.
+		ttl : int, optional
+			The time to live in ms. If the notification is queued and has not
+			been shown after this time, it is discarded with OUTCOME_EXPIRED.
+			Defaults to the ttl of the area; 0 means that the notification does
+			not expire.
+
+		Returns
+		-------
+		QNotificationHandle
+			Refers to the notification. Its outcome (clicked, timed out, etc.)
+			can be obtained through handle.future, or by awaiting the handle.
 
 		Raises
 		------
 		ValueError
 			if the category is other than one of the expected values.
 		"""
-		notification = QNotification(message, category, timeout, autohide, buttontext, self)
-		notification.closeClicked.connect(self.remove)
+		if ttl is None:
+			ttl = self.ttl
+		if self.manager is not None:
+			handle = self.manager.display(message, category, timeout, autohide,
+				buttontext, target=self, ttl=ttl)
+		else:
+			check_category(category)
+			handle = QNotificationHandle(message, category, timeout, autohide,
+				buttontext)
+			self._enqueue(handle, ttl)
+		if self._recorder is not None:
+			self._recorder.record(u'display', id=handle.id,
+				message=handle.text(), category=category, timeout=timeout,
+				autohide=autohide, buttontext=buttontext, ttl=ttl)
+		return handle
+
+	def displayProgress(self, message, category=u'info', maximum=100,
+		completionTimeout=5000, buttontext=None, refreshRate=20):
+		""" Displays a notification with a progress bar, for a task that is
+		still running. The progress is reported through the returned handle,
+		from any thread. The notification stays visible until
+		handle.finish() is called, after which it changes to the success or
+		danger category and disappears after completionTimeout.
+
+		Parameters
+		----------
+		message : str
+			The message to display
+		category : {'primary', 'success', 'info', 'warning', 'danger'}
+			The type of notification while the task is running
+		maximum : int (default: 100)
+			The progress value at which the task is complete. If 0, a busy
+			indicator is shown.
+		completionTimeout : int or None (default: 5000)
+			The time the notification stays visible after the task has
+			finished. If None, it stays until it is closed.
+		buttontext : str, optional
+			The text to display on the closing button
+		refreshRate : int (default: 20)
+			The maximum number of times per second the notification is
+			refreshed
+
+		Returns
+		-------
+		QProgressHandle
+			Refers to the notification, and receives its progress
 
-		# Queue if max amount of notifications is shown
-		if self.useQueue and self.layout().count() >= self.maxMessages:
-			self.queue.put(notification)
+		Raises
+		------
+		ValueError
+			if the category is other than one of the expected values.
+		"""
+		check_category(category)
+		handle = QProgressHandle(message, category, maximum, completionTimeout,
+			buttontext, refreshRate)
+		if self.manager is not None:
+			self.manager._enqueue(handle, self)
+		else:
+			self._enqueue(handle)
+		return handle
+
+	def _enqueue(self, handle, ttl=None):
+		""" Shows a new handle, or queues it if there is no room. """
+		self._handles[handle.id] = handle
+		self.history.add(handle.message, handle.category)
+
+		# Queue if max amount of notifications is shown. The notification
+		# widget is only created once the notification is shown.
+		if self.useQueue and not self._has_room():
+			handle._seq = next(self._queueSeq)
+			self.queue[handle._seq] = handle
+			handle.queuedAt = self.clock.elapsed()
+			if ttl:
+				handle.expiresAt = self.clock.elapsed() + ttl
+			self._watch_queued(handle)
+			if self.textLayoutCache is not None:
+				self.textLayoutCache.prefetch([handle.message])
 		else:
-			self._show_notification(notification)
-			
+			self._show_notification(handle)
+
+	def _watch_queued(self, handle):
+		""" Starts the latency control and the removal of expired
+		notifications, if needed for a handle that has been queued. """
+		if self.latencyTarget is not None and \
+			not self._latencyControl.isActive():
+			self._latencyControl.start()
+		if handle.expiresAt is not None and not self._ttlSweep.isActive():
+			self._ttlSweep.start()
+
+	def updateNotification(self, handle, message=_UNCHANGED, category=_UNCHANGED,
+		timeout=_UNCHANGED):
+		""" Changes a notification that is shown or queued, without replacing
+		its widget. Arguments that are not passed are left unchanged.
+
+		Parameters
+		----------
+		handle : QNotificationHandle
+			The notification to change, as returned by display()
+		message : str or bytes, optional
+			The new message
+		category : {'primary', 'success', 'info', 'warning', 'danger'}, optional
+			The new category
+		timeout : int or None, optional
+			The new timeout. If the notification is shown, it will disappear
+			this many ms from now. None keeps it on screen indefinitely.
+
+		Returns
+		-------
+		bool
+			False if the notification has already disappeared (or has been
+			removed), True otherwise.
+
+		Raises
+		------
+		ValueError
+			if the category is other than one of the expected values.
+		"""
+		if category is not _UNCHANGED:
+			check_category(category)
+		if handle.done():
+			return False
+		if self._recorder is not None:
+			changes = dict((key, value) for key, value in ((u'message', message),
+				(u'category', category), (u'timeout', timeout))
+				if value is not _UNCHANGED)
+			if u'message' in changes:
+				changes[u'message'] = safe_decode(message)
+			self._recorder.record(u'update', id=handle.id, **changes)
+		if message is not _UNCHANGED:
+			handle.message = message
+			self.history.add(handle.message, handle.category \
+				if category is _UNCHANGED else category)
+		if category is not _UNCHANGED:
+			handle.category = category
+		if timeout is not _UNCHANGED:
+			handle.timeout = timeout
+		if self.manager is not None:
+			self.manager._update(handle, message, category, timeout)
+		elif handle.notification is not None:
+			self._update_notification(handle.notification, message, category,
+				timeout)
+		elif message is not _UNCHANGED and self.textLayoutCache is not None:
+			self.textLayoutCache.prefetch([handle.message])
+		return True
+
+	def _update_notification(self, notification, message, category, timeout):
+		""" Applies changes to a notification widget. """
+		if message is not _UNCHANGED:
+			notification.setMessage(notification.handle.text())
+		if category is not _UNCHANGED:
+			notification.setCategory(category)
+		if timeout is not _UNCHANGED:
+			notification.timeout = timeout
+			if self.manager is None:
+				notification.startTimeout()
+				if self._suspended or notification.isExpanded():
+					notification.pauseTimeout()
+		self.adjustSize()
+
+	def _on_expanded_changed(self, notification, expanded):
+		self.adjustSize()
+		if self.manager is not None:
+			# The manager runs the timeout
+			self.manager._on_expanded_changed(notification.handle, expanded)
+		elif not expanded and self._suspended:
+			notification.pauseTimeout()
+		if not expanded:
+			self._admit()
+
 	def _cursor_in_area(self):
 		geom = self.geometry()
 		top_left = self.mapToGlobal(geom.topLeft())
@@ -265,29 +1128,200 @@ class QNotificationArea(QtWidgets.QWidget):
 		cursor_pos = QtGui.QCursor().pos()
 		return geom.contains(cursor_pos)
 
-	def _show_notification(self, notification):
+	def _create_notification(self, handle):
+		""" Creates the widget for the notification referred to by handle. """
+		if isinstance(handle, QProgressHandle):
+			notification = QProgressNotification(handle, self,
+				staticTextCache=self.staticTextCache,
+				textLayoutCache=self.textLayoutCache, clock=self.clock,
+				maxChars=self.maxChars, maxLines=self.maxLines)
+			notification.completed.connect(
+				functools.partial(self._on_progress_completed, handle))
+		else:
+			notification = QNotification(handle.text(), handle.category,
+				handle.timeout, handle.autohide, handle.buttontext, self,
+				staticTextCache=self.staticTextCache,
+				textLayoutCache=self.textLayoutCache, clock=self.clock,
+				maxChars=self.maxChars, maxLines=self.maxLines)
+		notification.handle = handle
+		notification.expandedChanged.connect(
+			functools.partial(self._on_expanded_changed, notification))
+		notification.closeClicked.connect(self.remove)
+		notification.timedOut.connect(self._on_timed_out)
+		notification.fadeInAnimation.valueChanged.connect(
+			self._on_animation_frame)
+		notification.fadeOutAnimation.valueChanged.connect(
+			self._on_animation_frame)
+		handle.notification = notification
+		return notification
+
+	def _show_notification(self, handle):
+		""" Shows a notification, or schedules it to be shown if a frame
+		budget is set. """
+		if self.frameBudget is None:
+			self._show_notification_now(handle)
+			return
+		self._pending.append(handle)
+		if not self._materializeScheduled:
+			self._materializeScheduled = True
+			QtCore.QTimer.singleShot(0, self._materialize)
+
+	def _materialize(self):
+		""" Shows pending notifications until the frame budget is used up, and
+		continues in the next pass of the event loop if necessary. """
+		self._materializeScheduled = False
+		if self._suspended:
+			# Continued by resume()
+			return
+		timer = QtCore.QElapsedTimer()
+		timer.start()
+		while self._pending:
+			if self.frameBudget is not None and \
+				timer.elapsed() >= self.frameBudget:
+				self._materializeScheduled = True
+				QtCore.QTimer.singleShot(0, self._materialize)
+				return
+			self._show_notification_now(self._pending.popleft())
+
+	def _show_notification_now(self, handle):
+		if handle.done():
+			# Removed while waiting to be shown
+			return
+		if self._suspended:
+			# Without a queue, notifications are still accepted while the area
+			# is suspended. They are held back until resume(), so that their
+			# timeouts do not run out unseen.
+			self._pending.append(handle)
+			return
 		if self._cursor_in_area():
-			QtCore.QTimer.singleShot(
+			self.clock.singleShot(
 				1000,
-				lambda : self._show_notification(notification)
+				lambda : self._show_notification_now(handle)
 			)
 			return
+		notification = self._create_notification(handle)
 		if not self.isVisible():
 			self.show()
 			self.raise_()
 		self.layout().addWidget(notification)
+		self._visible[handle.id] = notification
+		if self.adaptiveAnimations:
+			self._start_load_probe()
 		# Check for entry effects
-		if not self.entryEffect is None:
-			if self.entryEffect == u"fadeIn":
-				notification.fadeIn(self.entryEffectDuration)
+		duration = self._effect_duration(self.entryEffectDuration)
+		if self.entryEffect == u"fadeIn" and duration is not None:
+			notification.fadeIn(duration)
 		else:
 			notification.display()
 
 		self.adjustSize()
-		if not notification.timeout is None and notification.timeout > 0:
-			QtCore.QTimer.singleShot(notification.timeout,
-				lambda : self.remove(notification))
+		if self.manager is not None:
+			self.manager._on_shown(self, handle, notification)
+		else:
+			if handle.queuedAt is not None:
+				self._queueLatency = self.clock.elapsed() - handle.queuedAt
+			notification.startTimeout(
+				self._scaled_timeout(handle, self._timeoutScale))
+
+	def replace(self, notification, message, category, timeout=5000,
+		autohide=False, buttontext=None, ttl=None):
+		""" Replaces a queued or shown notification by a new one. A queued
+		notification is replaced at its place in the queue, and a shown one
+		makes way for the new notification right away. The outcome of the
+		replaced notification is OUTCOME_REPLACED. If it has already
+		disappeared, the new notification is displayed as usual.
+
+		Parameters
+		----------
+		notification : QNotificationHandle or int
+			The notification to replace, or the id of its handle
+		message, category, timeout, autohide, buttontext
+			The new notification (see display())
+		ttl : int, optional
+			The time to live of the new notification if it is queued (see
+			display()). A notification that replaces a queued one keeps the
+			time the old one had left.
+
+		Returns
+		-------
+		QNotificationHandle
+			Refers to the new notification
+
+		Raises
+		------
+		ValueError
+			if the category is other than one of the expected values.
+		"""
+		check_category(category)
+		if ttl is None:
+			ttl = self.ttl
+		if self.manager is not None:
+			handle = self.manager.replace(notification, message, category,
+				timeout, autohide, buttontext, target=self, ttl=ttl)
+			self._record_replace(handle, notification)
+			return handle
+		old = self._find_handle(notification)
+		handle = QNotificationHandle(message, category, timeout, autohide,
+			buttontext)
+		self._record_replace(handle, notification)
+		if old is None or old.done():
+			self._enqueue(handle, ttl)
+			return handle
+		self._handles[handle.id] = handle
+		self.history.add(handle.message, category)
+		if self.useQueue and self.queue.get(old._seq) is old:
+			handle._seq = old._seq
+			self.queue[handle._seq] = handle
+			# Waits as long as the old notification did
+			handle.queuedAt = old.queuedAt
+			handle.expiresAt = old.expiresAt
+			self._resolve(old, OUTCOME_REPLACED)
+			if self.textLayoutCache is not None:
+				self.textLayoutCache.prefetch([handle.message])
+		elif old.notification is None:
+			# Waiting for the frame budget
+			self._resolve(old, OUTCOME_REPLACED)
+			self._show_notification(handle)
+		elif self.useQueue:
+			# Put the new notification in front of the queue, so that it takes
+			# the place of the old one once that is gone.
+			handle._seq = next(self._queueSeq)
+			self.queue[handle._seq] = handle
+			self.queue.move_to_end(handle._seq, last=False)
+			handle.queuedAt = self.clock.elapsed()
+			if ttl:
+				handle.expiresAt = handle.queuedAt + ttl
+			self._watch_queued(handle)
+			old.notification.finishAnimations()
+			self._remove(old.notification, OUTCOME_REPLACED)
+		else:
+			old.notification.finishAnimations()
+			self._remove(old.notification, OUTCOME_REPLACED)
+			self._show_notification(handle)
+		return handle
+
+	def _record_replace(self, handle, old):
+		if self._recorder is not None:
+			self._recorder.record(u'replace', id=handle.id,
+				old=old.id if isinstance(old, QNotificationHandle) else old,
+				message=handle.text(), category=handle.category,
+				timeout=handle.timeout, autohide=handle.autohide,
+				buttontext=handle.buttontext)
+
+	def _find_handle(self, notification):
+		""" Returns the handle for a handle or handle id, or None if the
+		notification is not queued or shown in this area. """
+		if isinstance(notification, QNotificationHandle):
+			return notification
+		return self._handles.get(notification)
 
+	def _on_progress_completed(self, handle, success, message):
+		self.updateNotification(handle, message=message or _UNCHANGED,
+			category=u'success' if success else u'danger',
+			timeout=handle.completionTimeout)
+
+	def _on_timed_out(self):
+		self._remove(self.sender(), OUTCOME_TIMED_OUT)
 
 	@QtCore.Slot()
 	def remove(self, notification=None):
@@ -295,10 +1329,12 @@ class QNotificationArea(QtWidgets.QWidget):
 
 		Parameters
 		----------
-		notification : QNotification (default: None)
-			The notification to remove. This function also serves as a PyQt slot
-			for signals emitted from a QNotification. In this case, the QNotification
-			object is retrieved by using self.sender()
+		notification : QNotification, QNotificationHandle or int (default: None)
+			The notification to remove, or the id of its handle. This function
+			also serves as a PyQt slot for signals emitted from a QNotification.
+			In this case, the QNotification object is retrieved by using
+			self.sender(). If a notification is passed that is still queued, it
+			is taken out of the queue and will not be shown.
 
 		Raises
 		------
@@ -314,27 +1350,271 @@ class QNotificationArea(QtWidgets.QWidget):
 				raise ValueError(u'QNotification object needs to be passed '
 					'or this function should be used as a slot for a signal'
 					' emitted by a QNotification')
+			if notification.autoHidden:
+				outcome = OUTCOME_DISMISSED
+			else:
+				outcome = OUTCOME_CLICKED
+		else:
+			outcome = OUTCOME_DROPPED
+		if self._recorder is not None:
+			if isinstance(notification, QNotification):
+				handle_id = getattr(notification.handle, u'id', None)
+			elif isinstance(notification, QNotificationHandle):
+				handle_id = notification.id
+			else:
+				handle_id = notification
+			self._recorder.record(u'remove', id=handle_id, outcome=outcome)
+		if outcome == OUTCOME_DROPPED:
+			if not isinstance(notification, QNotification):
+				if self.manager is not None:
+					self.manager.remove(notification)
+					return
+				notification = self._find_handle(notification)
+				if notification is None:
+					return
+				if notification.notification is None:
+					# Still queued, or waiting for the frame budget
+					self._resolve(notification, outcome)
+					return
+				notification = notification.notification
+		self._remove(notification, outcome)
 
+	def _remove(self, notification, outcome):
+		""" Removes a notification and resolves its handle with outcome. """
 		if notification.isBeingRemoved or notification.isFadingIn:
 			return
 		notification.isBeingRemoved = True
 
 		# Check if notification is still present (and has not manually been
 		# closed before this function is called by a timeout)
-		if self.layout().indexOf(notification) < 0:
+		if self._visible.get(notification.handle.id) is not notification:
 			return
+		self._resolve(notification.handle, outcome)
 
 		# Implement animation here
-		if self.exitEffect == u'fadeOut':
-			notification.fadeOut(self.__delete_notification, self.exitEffectDuration)
+		duration = self._effect_duration(self.exitEffectDuration)
+		if self.exitEffect == u'fadeOut' and duration is not None:
+			notification.fadeOut(self.__delete_notification, duration)
 		else:
 			self.__delete_notification(notification)
 
+	def stats(self):
+		""" Returns statistics of this notification area.
+
+		Returns
+		-------
+		dict
+			Contains the following keys:
+
+			static_text_cache
+				The statistics of the static text cache (see
+				StaticTextCache.stats()), or None if static text is not used.
+			text_layout_cache
+				The statistics of the cache of precomputed message heights (see
+				TextLayoutCache.stats()), or None if preLayout is not used.
+			animation_mode
+				The current animation mode (see setAdaptiveAnimations())
+			event_loop_lag
+				The recent (peak) delay in ms with which the event loop handled
+				timers, measured while adaptive animations are enabled
+			frame_overrun
+				The recent (peak) time in ms by which the interval between animation
+				frames exceeded the normal interval
+			queue_latency
+				The time in ms the notification that was shown last waited in
+				the queue, or None
+			timeout_scale
+				The factor by which timeouts are currently shortened to meet the
+				latency target (see setLatencyTarget())
+			latency_target_met
+				False if the latency target is currently not met
+			expired
+				The number of queued notifications that were discarded because
+				their time to live had passed (counted by the manager for areas
+				that have one)
+			paint_count
+				The number of times the area and its notifications (also those
+				that have been removed) were painted
+			paint_time
+				The total time in ms these paints took
+			paint_cache_hits
+				The number of paints for which the background was taken from
+				QPixmapCache
+		"""
+		paintCount = self._paintCount
+		paintTime = self._paintTime
+		paintCacheHits = self._paintCacheHits
+		for notification in self._visible.values():
+			paintCount += notification.paintCount
+			paintTime += notification.paintTime
+			paintCacheHits += notification.paintCacheHits
+		return {
+			u'queue_latency': self._queueLatency,
+			u'timeout_scale': self._timeoutScale,
+			u'latency_target_met': self._latencyMet,
+			u'expired': self._expired if self.manager is None \
+				else self.manager._expired,
+			u'animation_mode': self.animationMode,
+			u'event_loop_lag': self._eventLoopLag,
+			u'frame_overrun': self._frameOverrun,
+			u'static_text_cache': self.staticTextCache.stats() \
+				if self.staticTextCache is not None else None,
+			u'text_layout_cache': self.textLayoutCache.stats() \
+				if self.textLayoutCache is not None else None,
+			u'paint_count': paintCount,
+			u'paint_time': paintTime,
+			u'paint_cache_hits': paintCacheHits,
+		}
+
+	def resourceUsage(self):
+		""" Returns the resources held by this area, and an estimate of the
+		memory they take. Only the children of the area and its queued
+		notifications are counted, so this is cheap enough to be polled every
+		second.
+
+		Returns
+		-------
+		dict
+			Contains the following keys:
+
+			notifications
+				The number of notification widgets (including those that are
+				fading out)
+			pending
+				The number of notifications that wait for the frame budget,
+				and have no widget yet
+			queued
+				The number of queued notifications (kept by the manager for
+				areas that have one), which have no widget yet
+			handles
+				The number of handles of notifications that are queued or
+				shown
+			qobjects
+				The number of QObjects of the area, including the area itself,
+				by class name
+			static_text_cache
+				The number of texts in the static text cache, which is shared
+				by all areas, or None if static text is not used
+			text_layout_cache
+				The number of precomputed message heights, or None if preLayout
+				is not used
+			history
+				The number of entries in the history
+			estimated_bytes
+				A rough estimate of the memory held by the QObjects, the
+				handles and the history
+		"""
+		usage, objectBytes = self._resource_usage()
+		usage[u'estimated_bytes'] = objectBytes + _history_bytes(self.history)
+		return usage
+
+	def _resource_usage(self):
+		""" The resource usage, without the estimated size, and the estimated
+		size without the history. """
+		qobjects = collections.Counter()
+		widgets = 0
+		for obj in [self] + self.findChildren(QtCore.QObject):
+			qobjects[obj.metaObject().className()] += 1
+			if obj.isWidgetType():
+				widgets += 1
+		size = widgets * WIDGET_BYTES_ESTIMATE + \
+			(sum(qobjects.values()) - widgets) * QOBJECT_BYTES_ESTIMATE
+		if self.manager is not None:
+			# The manager keeps the handles
+			lane = self.manager._lanes.get(self, {})
+			queued = len(lane)
+			handles = dict((handle.id, handle) for handle in lane.values())
+			for notification in self._visible.values():
+				handles[notification.handle.id] = notification.handle
+		else:
+			queued = len(self.queue) if self.useQueue else 0
+			handles = self._handles
+		getsizeof = sys.getsizeof
+		for handle in handles.values():
+			size += getsizeof(handle) + getsizeof(handle.message)
+		return {
+			u'notifications': self.layout().count(),
+			u'pending': len(self._pending),
+			u'queued': queued,
+			u'handles': len(handles),
+			u'qobjects': dict(qobjects),
+			u'static_text_cache': len(self.staticTextCache) \
+				if self.staticTextCache is not None else None,
+			u'text_layout_cache': self.textLayoutCache.stats()[u'size'] \
+				if self.textLayoutCache is not None else None,
+			u'history': len(self.history),
+		}, size
+
+	@classmethod
+	def totalResourceUsage(cls):
+		""" Returns the resources held by all notification areas of the
+		application, in the same form as resourceUsage(). Caches and
+		histories that are shared by several areas are counted once.
+
+		Returns
+		-------
+		dict
+			The sums of the values of resourceUsage() over all areas, and the
+			number of areas under areas
+		"""
+		total = {
+			u'areas': 0,
+			u'notifications': 0,
+			u'pending': 0,
+			u'queued': 0,
+			u'handles': 0,
+			u'qobjects': collections.Counter(),
+			u'static_text_cache': None,
+			u'text_layout_cache': None,
+			u'history': 0,
+			u'estimated_bytes': 0,
+		}
+		histories = {}
+		for area in list(cls._areas):
+			try:
+				usage, size = area._resource_usage()
+			except RuntimeError:
+				# The Qt object has already been deleted
+				continue
+			total[u'areas'] += 1
+			for key in (u'notifications', u'pending', u'queued', u'handles'):
+				total[key] += usage[key]
+			total[u'qobjects'].update(usage[u'qobjects'])
+			if usage[u'static_text_cache'] is not None:
+				total[u'static_text_cache'] = usage[u'static_text_cache']
+			if usage[u'text_layout_cache'] is not None:
+				total[u'text_layout_cache'] = \
+					(total[u'text_layout_cache'] or 0) + usage[u'text_layout_cache']
+			total[u'estimated_bytes'] += size
+			histories[id(area.history)] = area.history
+		for history in histories.values():
+			total[u'history'] += len(history)
+			total[u'estimated_bytes'] += _history_bytes(history)
+		total[u'qobjects'] = dict(total[u'qobjects'])
+		return total
+
 	# Internal Qt functions
+	def eventFilter(self, obj, event):
+		""" Internal QT function (do not call directly). """
+		if event.type() == QtCore.QEvent.Resize and \
+			obj is self.targetWidget and self.heightLimit is not None:
+			self._admit()
+		elif self.autoSuspend and event.type() in (QtCore.QEvent.Show,
+			QtCore.QEvent.Hide, QtCore.QEvent.WindowStateChange,
+			QtCore.QEvent.Expose):
+			try:
+				self._update_suspended()
+			except RuntimeError:
+				# The target widget is being destroyed
+				pass
+		return super(QNotificationArea, self).eventFilter(obj, event)
+
 	def resizeEvent(self, event):
 		""" Internal QT function (do not call directly). """
 		self.target_resize_event(event)
 		newsize = event.size()
+		if self.textLayoutCache is not None and newsize.width() != self.width():
+			self.textLayoutCache.invalidate()
 		self.setFixedWidth(newsize.width())
 		self.adjustSize()
 
@@ -342,7 +1622,14 @@ class QNotificationArea(QtWidgets.QWidget):
 		""" Redefinition of paintEvent.
 		Makes class QNotificationArea available in style sheets.
 		Internal QT function (do not call directly) """
+		start = default_timer()
+		# The background of the area is usually transparent, and its height
+		# changes with every notification, so it is painted directly instead
+		# of being cached like those of notifications.
 		o = QtWidgets.QStyleOption()
 		o.initFrom(self)
 		p = QtGui.QPainter(self)
 		self.style().drawPrimitive(QtWidgets.QStyle.PE_Widget, o, p, self)
+		p.end()
+		self._paintCount += 1
+		self._paintTime += (default_timer() - start) * 1000
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+from qtpy import QtWidgets, QtCore
+from QNotifications.QNotification import CATEGORIES
+from QNotifications.abstractions import *
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+class QNotificationHistoryModel(QtCore.QAbstractTableModel):
+	""" Item model presenting the entries of a QNotificationHistory, newest
+	first. Rows are not created up front: matching entries are looked up in
+	batches when a view asks for them through canFetchMore() and fetchMore(),
+	so the cost of (re)filtering does not depend on the size of the history.
+	"""
+
+	columns = [u'Time', u'Category', u'Message']
+
+	fetchBatchSize = 256
+	""" The number of matching rows to add per call to fetchMore() """
+
+	scanBatchSize = 20000
+	""" The maximum number of history entries to inspect per call to
+	fetchMore(). If no match has been found by then, the scan is continued
+	from the event loop, so that the GUI stays responsive. """
+
+	def __init__(self, history, parent=None):
+		"""Constructor
+
+		Parameters
+		----------
+		history : QNotificationHistory
+			The history to present
+		parent : QtCore.QObject, optional
+			The parent of this model
+		"""
+		super(QNotificationHistoryModel, self).__init__(parent)
+		self.history = history
+		self._category = None
+		self._text = u''
+		# Rows consist of two lists of sequence numbers: entries that were
+		# added after the last reset (ascending, shown at the top in reverse)
+		# and entries found by scanning the history (descending). Both only
+		# grow at their ends, which keeps adding rows cheap.
+		self._newer = []
+		self._older = []
+		self._scanPos = history.lastSeq
+		self._scanScheduled = False
+		history.entryAdded.connect(self._on_entry_added)
+		history.entriesDropped.connect(self._on_entries_dropped)
+
+	def setFilter(self, category=None, text=u''):
+		""" Only shows entries of the given category whose message contains
+		text (case insensitive).
+
+		Parameters
+		----------
+		category : {'primary', 'success', 'info', 'warning', 'danger', None}
+			The category to show, or None to show all categories
+		text : str (default: '')
+			The text to look for in messages
+		"""
+		text = safe_decode(text).lower()
+		if category == self._category and text == self._text:
+			return
+		self.beginResetModel()
+		self._category = category
+		self._text = text
+		self._newer = []
+		self._older = []
+		self._scanPos = self.history.lastSeq
+		self.endResetModel()
+
+	def _matches(self, entry):
+		if self._category is not None and entry[1] != self._category:
+			return False
+		return not self._text or self._text in entry[2].lower()
+
+	def _seq(self, row):
+		n_newer = len(self._newer)
+		if row < n_newer:
+			return self._newer[n_newer - row - 1]
+		return self._older[row - n_newer]
+
+	def _on_entry_added(self, seq):
+		entry = self.history.entry(seq)
+		if entry is None or not self._matches(entry):
+			return
+		self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+		self._newer.append(seq)
+		self.endInsertRows()
+
+	def _on_entries_dropped(self, first):
+		# Dropped entries are the oldest ones, so they are at the bottom.
+		count = 0
+		for seq in reversed(self._older):
+			if seq >= first:
+				break
+			count += 1
+		if count == len(self._older):
+			for seq in self._newer:
+				if seq >= first:
+					break
+				count += 1
+		if count:
+			total = self.rowCount()
+			self.beginRemoveRows(QtCore.QModelIndex(), total - count, total - 1)
+			n_older = min(count, len(self._older))
+			del self._older[len(self._older) - n_older:]
+			del self._newer[:count - n_older]
+			self.endRemoveRows()
+		self._scanPos = max(self._scanPos, first - 1)
+
+	def _continue_scan(self):
+		self._scanScheduled = False
+		if self.canFetchMore(QtCore.QModelIndex()):
+			self.fetchMore(QtCore.QModelIndex())
+
+	# Internal Qt functions
+	def canFetchMore(self, parent):
+		""" Internal QT function (do not call directly). """
+		if parent.isValid():
+			return False
+		return self._scanPos >= self.history.firstSeq
+
+	def fetchMore(self, parent):
+		""" Internal QT function (do not call directly). """
+		if parent.isValid():
+			return
+		found = []
+		seq = self._scanPos
+		stop = max(self.history.firstSeq, seq - self.scanBatchSize + 1)
+		while seq >= stop and len(found) < self.fetchBatchSize:
+			entry = self.history.entry(seq)
+			if self._matches(entry):
+				found.append(seq)
+			seq -= 1
+		self._scanPos = seq
+		if found:
+			total = self.rowCount()
+			self.beginInsertRows(QtCore.QModelIndex(), total,
+				total + len(found) - 1)
+			self._older.extend(found)
+			self.endInsertRows()
+		elif self._scanPos >= self.history.firstSeq and not self._scanScheduled:
+			# Nothing found yet. The view won't ask again, because no rows
+			# were added, so keep scanning from the event loop.
+			self._scanScheduled = True
+			QtCore.QTimer.singleShot(0, self._continue_scan)
+
+	def rowCount(self, parent=QtCore.QModelIndex()):
+		""" Internal QT function (do not call directly). """
+		if parent.isValid():
+			return 0
+		return len(self._newer) + len(self._older)
+
+	def columnCount(self, parent=QtCore.QModelIndex()):
+		""" Internal QT function (do not call directly). """
+		if parent.isValid():
+			return 0
+		return len(self.columns)
+
+	def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+		""" Internal QT function (do not call directly). """
+		if orientation == QtCore.Qt.Horizontal and \
+			role == QtCore.Qt.DisplayRole:
+			return self.columns[section]
+		return None
+
+	def data(self, index, role=QtCore.Qt.DisplayRole):
+		""" Internal QT function (do not call directly). """
+		if not index.isValid() or index.row() >= self.rowCount():
+			return None
+		seq = self._seq(index.row())
+		if role == QtCore.Qt.UserRole:
+			return seq
+		if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+			return None
+		entry = self.history.entry(seq)
+		if entry is None:
+			return None
+		timestamp, category, message = entry
+		column = index.column()
+		if column == 0:
+			if role == QtCore.Qt.ToolTipRole:
+				return time.strftime(u'%Y-%m-%d %H:%M:%S',
+					time.localtime(timestamp))
+			return time.strftime(u'%H:%M:%S', time.localtime(timestamp))
+		if column == 1:
+			return category
+		if role == QtCore.Qt.ToolTipRole:
+			return message
+		# Only show the first line in the list itself
+		return message.split(u'\n', 1)[0]
+
+
+class QNotificationCenter(QtWidgets.QWidget):
+	""" Scrollable panel listing past notifications from a
+	QNotificationHistory, which can be filtered by category and text. """
+
+	filterDelay = 150
+	""" The time (in ms) to wait after the filter text has been edited, before
+	the filter is applied. """
+
+	def __init__(self, history, *args, **kwargs):
+		"""Constructor
+
+		Parameters
+		----------
+		history : QNotificationHistory
+			The history to show, for instance QNotificationArea.history
+		"""
+		super(QNotificationCenter, self).__init__(*args, **kwargs)
+		self.model = QNotificationHistoryModel(history, self)
+
+		self.categoryFilter = QtWidgets.QComboBox(self)
+		self.categoryFilter.addItem(u'All categories', None)
+		for category in CATEGORIES:
+			self.categoryFilter.addItem(category, category)
+		self.categoryFilter.currentIndexChanged.connect(self._apply_filter)
+
+		self.textFilter = QtWidgets.QLineEdit(self)
+		self.textFilter.setPlaceholderText(u'Filter')
+		self.textFilter.setClearButtonEnabled(True)
+		self._filterTimer = QtCore.QTimer(self)
+		self._filterTimer.setSingleShot(True)
+		self._filterTimer.setInterval(self.filterDelay)
+		self._filterTimer.timeout.connect(self._apply_filter)
+		self.textFilter.textChanged.connect(self._filterTimer.start)
+
+		# Uniform row heights let the view lay out rows without asking the
+		# model for every one of them.
+		self.view = QtWidgets.QTreeView(self)
+		self.view.setRootIsDecorated(False)
+		self.view.setUniformRowHeights(True)
+		self.view.setAlternatingRowColors(True)
+		self.view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+		self.view.setModel(self.model)
+
+		filterLayout = QtWidgets.QHBoxLayout()
+		filterLayout.setContentsMargins(0,0,0,0)
+		filterLayout.addWidget(self.categoryFilter)
+		filterLayout.addWidget(self.textFilter, 1)
+
+		self.setLayout(QtWidgets.QVBoxLayout())
+		self.layout().addLayout(filterLayout)
+		self.layout().addWidget(self.view)
+
+	def _apply_filter(self):
+		self._filterTimer.stop()
+		self.model.setFilter(
+			self.categoryFilter.itemData(self.categoryFilter.currentIndex()),
+			self.textFilter.text()
+		)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import itertools
+
+from QNotifications.abstractions import *
+
+try:
+	from concurrent.futures import Future
+except ImportError:
+	# Python 2 without the futures backport
+	Future = None
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+OUTCOME_CLICKED = u'clicked'
+""" The user clicked the close button (or the button with buttontext) """
+OUTCOME_DISMISSED = u'dismissed'
+""" The notification was hidden because the mouse moved over it (autohide) """
+OUTCOME_TIMED_OUT = u'timed-out'
+""" The notification disappeared after its timeout """
+OUTCOME_DROPPED = u'dropped'
+""" The notification was removed by the program, or discarded before it could
+be shown """
+OUTCOME_REPLACED = u'replaced'
+""" The notification was replaced by another notification """
+OUTCOME_EXPIRED = u'expired'
+""" The notification was discarded because it waited in the queue for longer
+than its time to live """
+
+# Default for arguments that should be left unchanged when None is a valid value
+_UNCHANGED = object()
+
+
+class QNotificationHandle(object):
+	""" Refers to a notification that has been passed to
+	QNotificationArea.display(). The handle stores everything needed to create
+	the notification widget, so that a queued notification does not occupy
+	any widgets until it is shown.
+
+	The outcome of the notification (one of the OUTCOME_* values) is available
+	through the concurrent.futures.Future in the *future* attribute, and the
+	handle can be awaited directly from a coroutine running on an asyncio
+	event loop that is driven by Qt (for instance with qasync)::
+
+		outcome = await qna.display('Delete file?', 'warning', None,
+			buttontext='Undo')
+		if outcome == OUTCOME_CLICKED:
+			...
+	"""
+
+	_ids = itertools.count(1)
+
+	def __init__(self, message, category, timeout=None, autohide=False,
+		buttontext=None):
+		"""Constructor
+
+		Parameters
+		----------
+		message : str, bytes or memoryview
+			The message to show. Bytes are decoded as UTF-8 when the
+			notification is shown (see text()).
+		category : {'primary', 'success', 'info', 'warning', 'danger'}
+			The type of notification
+		timeout : int, optional
+			The duration for which the notification should be shown
+		autohide : bool (default: False)
+			Whether the notification is hidden when the mouse moves over it
+		buttontext : str, optional
+			The text of the closing button
+		"""
+		self.id = next(self._ids)
+		self.message = message
+		self.category = category
+		self.timeout = timeout
+		self.autohide = autohide
+		self.buttontext = buttontext
+		# The QNotification widget, once the notification is shown
+		self.notification = None
+		# The key of the handle in the queue of the area or manager
+		self._seq = None
+		# The time (on the clock of the area or manager that queued the
+		# notification) after which it is discarded if it is still queued
+		self.expiresAt = None
+		# The time (on the same clock) at which the notification was queued
+		self.queuedAt = None
+		self._outcome = None
+		self.future = Future() if Future is not None else None
+
+	@property
+	def message(self):
+		""" The message, as passed to display(). """
+		return self._message
+
+	@message.setter
+	def message(self, value):
+		""" Sets the message. Buffers are copied, because the caller may reuse
+		them, but not decoded. """
+		if isinstance(value, memoryview):
+			value = value.tobytes()
+		elif isinstance(value, bytearray):
+			value = bytes(value)
+		self._message = value
+
+	def text(self):
+		""" Returns the message as text. A message that was passed as bytes is
+		decoded on the first call, so notifications that are never shown are
+		never decoded. """
+		message = self._message
+		if not isinstance(message, str):
+			# The message is decoded in the GUI thread, long after display()
+			# has returned, so invalid bytes are replaced instead of raising
+			message = self._message = safe_decode(message, errors=u'replace')
+		return message
+
+	@property
+	def outcome(self):
+		""" The outcome of the notification, or None if it has not been
+		resolved yet. """
+		return self._outcome
+
+	def done(self):
+		""" Returns True if the notification has been resolved. """
+		return self.outcome is not None
+
+	def result(self, timeout=None):
+		""" Waits for the outcome of the notification and returns it. Must not
+		be called from the GUI thread without a timeout, because the outcome is
+		determined in the GUI thread.
+
+		Parameters
+		----------
+		timeout : float, optional
+			The maximum number of seconds to wait
+
+		Returns
+		-------
+		str
+			One of the OUTCOME_* values
+
+		Raises
+		------
+		concurrent.futures.TimeoutError
+			if the outcome is not available within timeout seconds
+		"""
+		return self.future.result(timeout)
+
+	def _resolve(self, outcome):
+		""" Sets the outcome of the notification, unless it is already set.
+		Returns True if the outcome was set. """
+		if self._outcome is not None:
+			return False
+		self._outcome = outcome
+		# The future may have been cancelled by whoever waited for it
+		if self.future is not None and not self.future.done():
+			self.future.set_result(outcome)
+		return True
+
+	def __await__(self):
+		import asyncio
+		return asyncio.wrap_future(self.future).__await__()
+
+	def __repr__(self):
+		return u'<QNotificationHandle {} {} {!r}>'.format(self.id,
+			self.category, self.message)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+from qtpy import QtCore
+from QNotifications.abstractions import *
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+class QNotificationHistory(QtCore.QObject):
+	""" Store of the notifications that have been passed to one or more
+	notification areas. Every entry receives an increasing sequence number,
+	by which it can be retrieved later on. When the maximum number of entries
+	is exceeded, the oldest entries are discarded in chunks. """
+
+	entryAdded = QtCore.Signal(int)
+	""" PyQt signal emitted with the sequence number of a newly added entry. """
+
+	entriesDropped = QtCore.Signal(int)
+	""" PyQt signal emitted after old entries have been discarded. Passes the
+	sequence number of the oldest entry that is still available. """
+
+	def __init__(self, maxEntries=100000, parent=None, maxMessageLength=2000):
+		"""Constructor
+
+		Parameters
+		----------
+		maxEntries : int or None (default: 100000)
+			The maximum number of entries to keep. If None, the history grows
+			without bounds. If 0, nothing is recorded.
+		parent : QtCore.QObject, optional
+			The parent of this object
+		maxMessageLength : int or None (default: 2000)
+			The maximum number of characters (or bytes) of a message that are
+			kept. Longer messages are cut off, and end with an ellipsis. If
+			None, messages are kept in full.
+
+		Raises
+		------
+		ValueError
+			if maxEntries or maxMessageLength is negative
+		"""
+		super(QNotificationHistory, self).__init__(parent)
+		if maxEntries is not None and maxEntries < 0:
+			raise ValueError(u'maxEntries should not be negative')
+		if maxMessageLength is not None and maxMessageLength < 0:
+			raise ValueError(u'maxMessageLength should not be negative')
+		self.maxEntries = maxEntries
+		self.maxMessageLength = maxMessageLength
+		# Entries are (timestamp, category, message) tuples. The sequence
+		# number of self._entries[0] is stored in self._first.
+		self._entries = []
+		self._first = 0
+
+	def add(self, message, category, timestamp=None):
+		""" Adds an entry to the history.
+
+		Parameters
+		----------
+		message : str or bytes
+			The message of the notification. Bytes are decoded as UTF-8 when
+			the entry is first retrieved.
+		category : str
+			The category of the notification
+		timestamp : float, optional
+			The time (in seconds since the epoch) at which the notification was
+			issued. Defaults to the current time.
+
+		Returns
+		-------
+		int
+			The sequence number of the new entry
+		"""
+		if self.maxEntries == 0:
+			# Nothing is kept, but sequence numbers still increase
+			self._first += 1
+			return self._first - 1
+		if timestamp is None:
+			timestamp = time.time()
+		limit = self.maxMessageLength
+		if limit is not None and len(message) > limit:
+			message = message[:limit]
+			if not isinstance(message, str):
+				# A character that was cut in two is left out
+				message = decode_prefix(message)
+			message += u'\u2026'
+		self._entries.append((timestamp, category, message))
+		seq = self._first + len(self._entries) - 1
+		self.entryAdded.emit(seq)
+		# Trim in chunks, so that entries are not removed from the front of the
+		# list one at a time.
+		if self.maxEntries is not None and \
+			len(self._entries) > self.maxEntries + max(1, self.maxEntries // 10):
+			excess = len(self._entries) - self.maxEntries
+			del self._entries[:excess]
+			self._first += excess
+			self.entriesDropped.emit(self._first)
+		return seq
+
+	def entry(self, seq):
+		""" Retrieves an entry by its sequence number.
+
+		Parameters
+		----------
+		seq : int
+			The sequence number of the entry
+
+		Returns
+		-------
+		tuple or None
+			A (timestamp, category, message) tuple, or None if there is no
+			entry with this sequence number (anymore).
+		"""
+		index = seq - self._first
+		if index < 0 or index >= len(self._entries):
+			return None
+		entry = self._entries[index]
+		if not isinstance(entry[2], str):
+			entry = self._entries[index] = (entry[0], entry[1],
+				safe_decode(entry[2], errors=u'replace'))
+		return entry
+
+	def clear(self):
+		""" Removes all entries. Sequence numbers are not reused. """
+		self._first += len(self._entries)
+		self._entries = []
+		self.entriesDropped.emit(self._first)
+
+	@property
+	def firstSeq(self):
+		""" The sequence number of the oldest available entry. """
+		return self._first
+
+	@property
+	def lastSeq(self):
+		""" The sequence number of the newest entry, or firstSeq - 1 if the
+		history is empty. """
+		return self._first + len(self._entries) - 1
+
+	def __len__(self):
+		return len(self._entries)
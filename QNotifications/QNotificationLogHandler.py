@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import logging
+
+from qtpy import QtCore
+from QNotifications.abstractions import *
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+LOG_CATEGORIES = {
+	logging.DEBUG: u'primary',
+	logging.INFO: u'info',
+	logging.WARNING: u'warning',
+	logging.ERROR: u'danger',
+}
+""" The default mapping of log levels to notification categories. A record
+gets the category of the highest level that does not exceed its own level. """
+
+
+def _record_key(record):
+	""" Returns the key by which records are combined: the logger and the
+	message template. Templates that cannot be hashed, such as dicts, are
+	compared by their representation, and otherwise not combined. """
+	key = (record.name, record.msg)
+	try:
+		hash(key)
+	except TypeError:
+		try:
+			key = (record.name, u'repr', repr(record.msg))
+		except Exception:
+			key = (record.name, u'id', id(record))
+	return key
+
+
+class _Wakeup(QtCore.QObject):
+	""" Carries the wakeup of the handler to the GUI thread. """
+	triggered = QtCore.Signal()
+
+
+class QNotificationLogHandler(logging.Handler):
+	""" Logging handler that shows log records as notifications in a
+	QNotificationArea.
+
+	Records can be emitted from any thread. emit() only appends the record
+	to a buffer, and asks the GUI thread once per batch to show what has been
+	buffered. There, records with the same logger and message template are
+	combined into a single notification, which is updated in place when the
+	same record occurs again while it is shown. If more notifications would
+	be created than maxRate per second allows, the surplus is summarized in a
+	single notification.
+
+	Records are formatted in the GUI thread, so arguments of a record should
+	not be changed after it has been logged.
+
+	Example::
+
+		handler = QNotificationLogHandler(qna)
+		logging.getLogger().addHandler(handler)
+	"""
+
+	def __init__(self, area, level=logging.WARNING, categories=None,
+		timeout=5000, flushInterval=100, maxRate=5, bufferSize=10000):
+		"""Constructor. Must be called from the GUI thread.
+
+		Parameters
+		----------
+		area : QNotificationArea
+			The area to display the notifications in
+		level : int (default: logging.WARNING)
+			The minimum level of the records to show
+		categories : dict, optional
+			Maps log levels to notification categories. Defaults to
+			LOG_CATEGORIES.
+		timeout : int or None (default: 5000)
+			The timeout of the notifications
+		flushInterval : int (default: 100)
+			The time in ms for which records are collected before they are
+			shown
+		maxRate : int (default: 5)
+			The maximum number of new notifications per second
+		bufferSize : int (default: 10000)
+			The maximum number of records that are buffered. If the GUI thread
+			falls behind, the oldest records are discarded.
+		"""
+		super(QNotificationLogHandler, self).__init__(level)
+		self.area = area
+		self.categories = sorted((LOG_CATEGORIES if categories is None \
+			else categories).items())
+		self.timeout = timeout
+		self.flushInterval = flushInterval
+		self.maxRate = maxRate
+		# The number of records that were not shown because of maxRate
+		self.suppressed = 0
+		# A deque can be appended to from any thread without locking
+		self._buffer = collections.deque(maxlen=bufferSize)
+		self._scheduled = False
+		# Notifications that may still be updated, by (logger, template)
+		self._shown = {}
+		self._summary = None
+		self._summaryCount = 0
+		self._suppressedLevel = logging.NOTSET
+		self._tokens = float(maxRate)
+		self._clock = QtCore.QElapsedTimer()
+		self._clock.start()
+		self._lastFlush = 0
+		self._wakeup = _Wakeup()
+		self._wakeup.triggered.connect(self._schedule_flush,
+			QtCore.Qt.QueuedConnection)
+
+	def category(self, levelno):
+		""" Returns the notification category for a log level. """
+		category = self.categories[0][1]
+		for level, name in self.categories:
+			if level > levelno:
+				break
+			category = name
+		return category
+
+	def emit(self, record):
+		""" Buffers a record. Called by logging, from any thread. """
+		self._buffer.append(record)
+		if not self._scheduled:
+			self._scheduled = True
+			self._wakeup.triggered.emit()
+
+	def _schedule_flush(self):
+		QtCore.QTimer.singleShot(self.flushInterval, self._flush)
+
+	def _flush(self):
+		""" Shows the buffered records. Runs in the GUI thread. """
+		# Reset the flag before taking the records, so that records that
+		# arrive from now on trigger a new flush.
+		self._scheduled = False
+		buffer = self._buffer
+		groups = collections.OrderedDict()
+		while buffer:
+			record = buffer.popleft()
+			key = _record_key(record)
+			group = groups.get(key)
+			if group is None:
+				groups[key] = [1, record]
+			else:
+				group[0] += 1
+				group[1] = record
+		now = self._clock.elapsed()
+		self._tokens = min(float(self.maxRate), self._tokens + \
+			(now - self._lastFlush) * self.maxRate / 1000.)
+		self._lastFlush = now
+		new = []
+		for key, (count, record) in groups.items():
+			shown = self._shown.get(key)
+			if shown is not None and not shown[0].done():
+				# Combine with the notification that is still shown
+				shown[1] += count
+				self._update(shown[0], record, shown[1])
+			else:
+				new.append((key, count, record))
+		# Show the most severe records first if not all of them fit
+		new.sort(key=lambda item: -item[2].levelno)
+		suppressed = 0
+		suppressedLevel = logging.NOTSET
+		for key, count, record in new:
+			if self._tokens < 1:
+				suppressed += count
+				suppressedLevel = max(suppressedLevel, record.levelno)
+				continue
+			self._tokens -= 1
+			handle = self.area.display(self._message(record, count),
+				self.category(record.levelno), self.timeout)
+			self._shown[key] = [handle, count]
+		if suppressed:
+			self.suppressed += suppressed
+			self._show_summary(suppressed, suppressedLevel)
+		if len(self._shown) > 1000:
+			self._shown = dict((key, shown) for key, shown in
+				self._shown.items() if not shown[0].done())
+
+	def _message(self, record, count):
+		try:
+			message = safe_decode(self.format(record))
+		except Exception:
+			self.handleError(record)
+			message = safe_decode(record.msg)
+		if count > 1:
+			message = u'{} ({}\u00d7)'.format(message, count)
+		return message
+
+	def _update(self, handle, record, count):
+		self.area.updateNotification(handle, message=self._message(record,
+			count), timeout=self.timeout)
+
+	def _show_summary(self, count, levelno):
+		""" Shows (or updates) the notification that counts the suppressed
+		records. """
+		if self._summary is None or self._summary.done():
+			self._summary = None
+			self._summaryCount = 0
+			self._suppressedLevel = logging.NOTSET
+		self._summaryCount += count
+		self._suppressedLevel = max(self._suppressedLevel, levelno)
+		message = u'{} more log messages were not shown'.format(
+			self._summaryCount)
+		category = self.category(self._suppressedLevel)
+		if self._summary is not None:
+			self.area.updateNotification(self._summary, message=message,
+				category=category, timeout=self.timeout)
+		else:
+			self._summary = self.area.display(message, category, self.timeout)
+
+	def close(self):
+		""" Detaches the handler. Records that are still buffered are
+		discarded. """
+		self._buffer.clear()
+		super(QNotificationLogHandler, self).close()
@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import functools
+import heapq
+import itertools
+
+from qtpy import QtWidgets, QtCore
+from QNotifications.QNotification import check_category
+from QNotifications.QNotificationHandle import QNotificationHandle, \
+	OUTCOME_TIMED_OUT, OUTCOME_DROPPED, OUTCOME_REPLACED, OUTCOME_EXPIRED, \
+	_UNCHANGED
+from QNotifications.QNotificationHistory import QNotificationHistory
+from QNotifications.clock import default_clock
+from QNotifications.abstractions import *
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+# Queue lanes for notifications without a specific target area
+ACTIVE_WINDOW = u'active'
+BROADCAST = u'broadcast'
+# The interval (in ms) at which expired notifications are removed from the
+# queue
+TTL_SWEEP_INTERVAL = 1000
+
+
+class QNotificationManager(QtCore.QObject):
+	""" Coordinates the notification areas of an application. Areas that are
+	created with a manager pass the notifications they receive on to it, and
+	the manager decides when and where they are shown. It owns a single queue,
+	history and timeout scheduler for all of these areas, and limits the
+	number of notifications that is shown at the same time over all areas.
+
+	Usually there is one manager per application, which is obtained with
+	instance()::
+
+		manager = QNotificationManager.instance()
+		qna = QNotificationArea(documentWindow, manager=manager)
+		# Shows the notification in the window that is currently active
+		manager.display('Autosave complete', 'info')
+		# Shows the notification in all visible windows
+		manager.display('Server going down', 'danger', None, broadcast=True)
+	"""
+
+	_instance = None
+
+	def __init__(self, maxMessages=4, history=None, parent=None, ttl=None,
+		clock=None):
+		"""Constructor
+
+		Parameters
+		----------
+		maxMessages : int or None (default: 4)
+			The maximum number of notifications shown at the same time over all
+			areas. A broadcast notification counts once. If None, only the
+			maxMessages setting of the individual areas applies.
+		history : QNotificationHistory or False, optional
+			The history in which the notifications are recorded. If not
+			provided, a new history is created. If False, notifications are
+			not recorded.
+		parent : QtCore.QObject, optional
+			The parent of this object
+		ttl : int or None (default: None)
+			The default time to live (in ms) of queued notifications (see
+			QNotificationArea.display())
+		clock : QtClock or VirtualClock, optional
+			The clock that runs the timeouts and times to live. Areas that are
+			created with this manager use it too. Defaults to real time.
+		"""
+		super(QNotificationManager, self).__init__(parent)
+		self.maxMessages = maxMessages
+		self.ttl = ttl
+		self.clock = clock or default_clock
+		if history is False:
+			history = QNotificationHistory(0, self)
+		elif history is None:
+			history = QNotificationHistory(parent=self)
+		self.history = history
+		self._areas = []
+		# The queue consists of one lane per target area, plus lanes for the
+		# active window and broadcasts. Each lane maps the sequence numbers of
+		# its handles (handle._seq) to the handles, in order; the sequence
+		# numbers keep the order over all lanes.
+		self._lanes = collections.OrderedDict()
+		self._lanes[ACTIVE_WINDOW] = collections.OrderedDict()
+		self._lanes[BROADCAST] = collections.OrderedDict()
+		self._seq = itertools.count()
+		# Handles of notifications that are queued or shown, and their lanes,
+		# by id
+		self._handles = {}
+		self._laneOf = {}
+		# Handles of notifications that are shown, by id
+		self._shown = {}
+		# The notification widgets showing a handle, by handle id
+		self._copies = {}
+		# Timeouts of all areas are run by a single timer, which is set to
+		# the earliest deadline.
+		self._deadlines = []
+		# The current deadline of each notification, by handle id. Entries in
+		# self._deadlines that do not match are outdated.
+		self._deadlineOf = {}
+		# Remaining times of timeouts that are frozen because the notification
+		# is only shown in suspended areas, by handle id
+		self._frozen = {}
+		self._timer = self.clock.createTimer(self)
+		self._timer.setSingleShot(True)
+		self._timer.timeout.connect(self._on_timer)
+		# Expiry of queued notifications
+		self._expired = 0
+		self._ttlSweep = self.clock.createTimer(self)
+		self._ttlSweep.setInterval(TTL_SWEEP_INTERVAL)
+		self._ttlSweep.timeout.connect(self._sweep_expired)
+
+	@classmethod
+	def instance(cls):
+		""" Returns the manager shared by the whole application, which is
+		created on first use. """
+		if cls._instance is None:
+			cls._instance = cls(parent=QtWidgets.QApplication.instance())
+		return cls._instance
+
+	def register(self, area):
+		""" Lets the manager show notifications in an area. This is done
+		automatically for areas that are created with a manager. """
+		if area in self._areas:
+			return
+		self._areas.append(area)
+		self._lanes[area] = collections.OrderedDict()
+		area.destroyed.connect(functools.partial(self._unregister, area))
+
+	def _unregister(self, area, *args):
+		if area not in self._areas:
+			return
+		self._areas.remove(area)
+		for handle in list(self._lanes.pop(area).values()):
+			self._resolve(handle, OUTCOME_DROPPED)
+		for handle_id, copies in list(self._copies.items()):
+			copies[:] = [c for c in copies if c[0] is not area]
+			if not copies:
+				handle = self._shown.get(handle_id)
+				if handle is not None:
+					self._resolve(handle, OUTCOME_DROPPED)
+		self._dispatch()
+
+	@property
+	def areas(self):
+		""" The registered notification areas. """
+		return list(self._areas)
+
+	def queueSize(self):
+		""" Returns the number of queued notifications. """
+		return sum(len(lane) for lane in self._lanes.values())
+
+	def display(self, message, category, timeout=5000, autohide=False,
+		buttontext=None, target=None, broadcast=False, ttl=None):
+		""" Displays a notification. The arguments are those of
+		QNotificationArea.display(), plus:
+
+		Parameters
+		----------
+		target : QNotificationArea or QtWidgets.QWidget, optional
+			The area to show the notification in, or a widget in the window of
+			that area. If None, the notification is shown in the window that is
+			active at the moment the notification is taken from the queue.
+		broadcast : bool (default: False)
+			If True, the notification is shown in all registered areas of
+			visible windows. It is queued once and counts once towards
+			maxMessages. While all areas are suspended, it stays queued.
+
+		Returns
+		-------
+		QNotificationHandle
+			Refers to the notification
+
+		Raises
+		------
+		ValueError
+			if the category is invalid, or target does not belong to a
+			registered area.
+		"""
+		check_category(category)
+		lane = self._lane_for(target, broadcast)
+		handle = QNotificationHandle(message, category, timeout, autohide,
+			buttontext)
+		self._enqueue(handle, lane, ttl)
+		return handle
+
+	def replace(self, notification, message, category, timeout=5000,
+		autohide=False, buttontext=None, target=None, broadcast=False,
+		ttl=None):
+		""" Replaces a queued or shown notification by a new one, which is
+		shown in the same way. A queued notification is replaced at its place
+		in the queue, and a shown one makes way for the new notification
+		right away. The outcome of the replaced notification is
+		OUTCOME_REPLACED. If it has already disappeared, the new notification
+		is displayed with the given target and broadcast arguments.
+
+		Parameters
+		----------
+		notification : QNotificationHandle or int
+			The notification to replace, or the id of its handle
+		message, category, timeout, autohide, buttontext, target, broadcast
+			The new notification (see display())
+		ttl : int, optional
+			The time to live of the new notification (see display()).
+			Defaults to the ttl of the manager. A notification that replaces a
+			queued one keeps the time the old one had left.
+
+		Returns
+		-------
+		QNotificationHandle
+			Refers to the new notification
+
+		Raises
+		------
+		ValueError
+			if the category is invalid, or target does not belong to a
+			registered area.
+		"""
+		check_category(category)
+		old = self._find_handle(notification)
+		if old is None or old.done():
+			return self.display(message, category, timeout, autohide,
+				buttontext, target, broadcast, ttl)
+		lane = self._laneOf[old.id]
+		entries = self._lanes[lane]
+		handle = QNotificationHandle(message, category, timeout, autohide,
+			buttontext)
+		self.history.add(handle.message, category)
+		self._handles[handle.id] = handle
+		self._laneOf[handle.id] = lane
+		# The new notification takes over the sequence number of the old one,
+		# which places it before all notifications that arrived later.
+		handle._seq = old._seq
+		if entries.get(old._seq) is old:
+			entries[handle._seq] = handle
+			handle.expiresAt = old.expiresAt
+			self._resolve(old, OUTCOME_REPLACED)
+			return handle
+		entries[handle._seq] = handle
+		entries.move_to_end(handle._seq, last=False)
+		if ttl is None:
+			ttl = self.ttl
+		if ttl:
+			handle.expiresAt = self.clock.elapsed() + ttl
+			if not self._ttlSweep.isActive():
+				self._ttlSweep.start()
+		copies = self._copies.get(old.id)
+		if not copies:
+			# Waiting for a frame budget
+			self._resolve(old, OUTCOME_REPLACED)
+			return handle
+		for area, widget in list(copies):
+			widget.finishAnimations()
+			area._remove(widget, OUTCOME_REPLACED)
+		return handle
+
+	def _lane_for(self, target, broadcast):
+		if broadcast:
+			return BROADCAST
+		if target is None:
+			return ACTIVE_WINDOW
+		lane = self._area_for(target)
+		if lane is None:
+			raise ValueError(u'No notification area registered for {}'.format(
+				target))
+		return lane
+
+	def _find_handle(self, notification):
+		if isinstance(notification, QNotificationHandle):
+			return notification
+		return self._handles.get(notification)
+
+	def _enqueue(self, handle, lane, ttl=None):
+		""" Queues a new handle in lane and shows it if possible. """
+		self.history.add(handle.message, handle.category)
+		self._handles[handle.id] = handle
+		self._laneOf[handle.id] = lane
+		handle._seq = next(self._seq)
+		self._lanes[lane][handle._seq] = handle
+		if ttl is None:
+			ttl = self.ttl
+		if ttl:
+			handle.expiresAt = self.clock.elapsed() + ttl
+			if not self._ttlSweep.isActive():
+				self._ttlSweep.start()
+		if lane in self._areas and lane.textLayoutCache is not None:
+			lane.textLayoutCache.prefetch([handle.message])
+		self._dispatch()
+
+	def remove(self, handle):
+		""" Removes a notification from all areas in which it is shown, or from
+		the queue.
+
+		Parameters
+		----------
+		handle : QNotificationHandle or int
+			The notification to remove, or the id of its handle
+		"""
+		handle = self._find_handle(handle)
+		if handle is None:
+			return
+		copies = self._copies.get(handle.id)
+		if not copies:
+			self._resolve(handle, OUTCOME_DROPPED)
+			return
+		for area, notification in list(copies):
+			area._remove(notification, OUTCOME_DROPPED)
+
+	def _area_for(self, target):
+		if target in self._areas:
+			return target
+		window = target.window()
+		for area in self._areas:
+			if area.targetWidget.window() is window:
+				return area
+		return None
+
+	def _active_area(self):
+		window = QtWidgets.QApplication.activeWindow()
+		if window is not None:
+			for area in reversed(self._areas):
+				if area.targetWidget.window() is window:
+					return area
+		for area in reversed(self._areas):
+			if area.targetWidget.isVisible():
+				return area
+		return self._areas[-1] if self._areas else None
+
+	def _has_room(self, area):
+		return area is not None and area._has_room()
+
+	def _targets(self, lane):
+		""" Returns the areas a notification from lane would be shown in, or
+		None if it cannot be shown right now. """
+		if lane == BROADCAST:
+			# Broadcasts wait while all areas are suspended
+			active = [area for area in self._areas if not area.isSuspended()]
+			areas = [area for area in active
+				if area.targetWidget.isVisible() and \
+				not area.targetWidget.window().isMinimized()]
+			return (areas or active) or None
+		if lane == ACTIVE_WINDOW:
+			area = self._active_area()
+		else:
+			area = lane
+		if not self._has_room(area):
+			return None
+		return [area]
+
+	def _dispatch(self):
+		""" Shows queued notifications while the budget allows it. """
+		now = self.clock.elapsed()
+		while self.maxMessages is None or len(self._shown) < self.maxMessages:
+			best = None
+			for lane, entries in self._lanes.items():
+				while entries:
+					seq, handle = next(iter(entries.items()))
+					if handle.expiresAt is None or handle.expiresAt > now:
+						break
+					self._expired += 1
+					self._discard(handle, OUTCOME_EXPIRED)
+				if not entries:
+					continue
+				seq = next(iter(entries))
+				if best is not None and seq > best[0]:
+					continue
+				targets = self._targets(lane)
+				if targets:
+					best = (seq, lane, targets)
+			if best is None:
+				return
+			seq, lane, targets = best
+			handle = self._lanes[lane].pop(seq)
+			self._shown[handle.id] = handle
+			for area in targets:
+				area._show_notification(handle)
+
+	def _on_shown(self, area, handle, notification):
+		""" Called by an area once it shows a notification. """
+		copies = self._copies.setdefault(handle.id, [])
+		copies.append((area, notification))
+		# The timeout starts with the first copy, which must already be listed
+		# so that _schedule() can tell whether it is only shown in suspended
+		# areas.
+		if len(copies) == 1:
+			self._schedule(handle)
+
+	def _schedule(self, handle):
+		""" (Re)starts the timeout of a shown notification. """
+		self._frozen.pop(handle.id, None)
+		if not handle.timeout:
+			self._deadlineOf.pop(handle.id, None)
+			return
+		deadline = self.clock.elapsed() + handle.timeout
+		self._deadlineOf[handle.id] = deadline
+		heapq.heappush(self._deadlines, (deadline, handle.id, handle))
+		self._arm_timer()
+		if self._is_held(handle.id):
+			self._freeze_held()
+
+	def _update(self, handle, message, category, timeout):
+		""" Applies changes made with QNotificationArea.updateNotification()
+		to all copies of a notification. """
+		copies = self._copies.get(handle.id, [])
+		for area, notification in copies:
+			area._update_notification(notification, message, category, timeout)
+		if copies and timeout is not _UNCHANGED:
+			self._schedule(handle)
+
+	def _sweep_expired(self):
+		""" Discards queued notifications that have expired. """
+		now = self.clock.elapsed()
+		for entries in self._lanes.values():
+			for handle in list(entries.values()):
+				if handle.expiresAt is not None and handle.expiresAt <= now:
+					self._expired += 1
+					self._discard(handle, OUTCOME_EXPIRED)
+		if not self.queueSize():
+			self._ttlSweep.stop()
+
+	def _resolve(self, handle, outcome):
+		""" Sets the outcome of a notification, removes all of its copies and
+		shows queued notifications that now fit. """
+		if self._discard(handle, outcome):
+			self._dispatch()
+
+	def _discard(self, handle, outcome):
+		""" Sets the outcome of a notification and removes all of its copies.
+		Returns True if the outcome was set. """
+		if not handle._resolve(outcome):
+			return False
+		entries = self._lanes.get(self._laneOf.pop(handle.id, None))
+		if entries is not None and entries.get(handle._seq) is handle:
+			del entries[handle._seq]
+		self._handles.pop(handle.id, None)
+		self._shown.pop(handle.id, None)
+		for area, notification in self._copies.pop(handle.id, []):
+			area._remove(notification, outcome)
+		return True
+
+	def _on_area_suspended(self, area):
+		""" Freezes the timeouts of notifications that are now only shown in
+		suspended areas. """
+		self._freeze_held()
+
+	def _on_area_resumed(self, area):
+		""" Restarts the frozen timeouts of notifications shown in area. """
+		self._thaw_released()
+
+	def _on_expanded_changed(self, handle, expanded):
+		""" Freezes the timeout of a notification while the full text of one
+		of its copies is shown, and restarts it when it is collapsed. """
+		if expanded:
+			self._freeze_held()
+		else:
+			self._thaw_released()
+
+	def _is_held(self, handle_id):
+		""" Whether the timeout of a shown notification should not run: while
+		it is only shown in suspended areas, or while the full text of one of
+		its copies is shown. """
+		copies = self._copies.get(handle_id)
+		if not copies:
+			return False
+		return all(a.isSuspended() for a, notification in copies) or \
+			any(notification.isExpanded() for a, notification in copies)
+
+	def _freeze_held(self):
+		""" Freezes the timeouts of the notifications that are held. """
+		now = self.clock.elapsed()
+		deadlines = []
+		for entry in self._deadlines:
+			if not self._is_current(entry):
+				continue
+			deadline, handle_id, handle = entry
+			if self._is_held(handle_id):
+				self._frozen[handle_id] = (max(0, deadline - now), handle)
+				del self._deadlineOf[handle_id]
+			else:
+				deadlines.append(entry)
+		heapq.heapify(deadlines)
+		self._deadlines = deadlines
+		self._arm_timer()
+
+	def _thaw_released(self):
+		""" Restarts the frozen timeouts of the notifications that are no
+		longer held, with the time they had left. """
+		now = self.clock.elapsed()
+		for handle_id, (remaining, handle) in list(self._frozen.items()):
+			if handle.done():
+				del self._frozen[handle_id]
+			elif not self._is_held(handle_id):
+				del self._frozen[handle_id]
+				self._deadlineOf[handle_id] = now + remaining
+				heapq.heappush(self._deadlines, (now + remaining, handle_id,
+					handle))
+		self._arm_timer()
+
+	def _is_current(self, entry):
+		deadline, handle_id, handle = entry
+		return not handle.done() and self._deadlineOf.get(handle_id) == deadline
+
+	def _arm_timer(self):
+		while self._deadlines and not self._is_current(self._deadlines[0]):
+			heapq.heappop(self._deadlines)
+		if not self._deadlines:
+			self._timer.stop()
+			return
+		delay = self._deadlines[0][0] - self.clock.elapsed()
+		self._timer.start(max(0, delay))
+
+	def _on_timer(self):
+		now = self.clock.elapsed()
+		while self._deadlines and self._deadlines[0][0] <= now:
+			entry = heapq.heappop(self._deadlines)
+			if not self._is_current(entry):
+				continue
+			deadline, handle_id, handle = entry
+			del self._deadlineOf[handle_id]
+			for area, notification in list(self._copies.get(handle_id, [])):
+				area._remove(notification, OUTCOME_TIMED_OUT)
+		self._arm_timer()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from qtpy import QtWidgets, QtCore
+from QNotifications.QNotificationArea import QNotificationArea
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+POSITIONS = [u'top-right', u'top-left', u'bottom-right', u'bottom-left']
+""" The corners of the screen an overlay can be placed in """
+
+
+class _OverlayArea(QNotificationArea):
+	""" Notification area of an overlay. Height limits are taken relative to
+	the screen, since the overlay itself is only as high as its
+	notifications. """
+
+	def _available_height(self):
+		return self.parentWidget().screenGeometry().height()
+
+
+class QNotificationOverlay(QtWidgets.QWidget):
+	""" Frameless, translucent top-level window that shows the notifications
+	of the whole application on one screen, in a corner of the screen. All
+	windows of the application can use the same overlay, so that the
+	notifications are composited as a single surface, instead of one
+	notification area per window.
+
+	The overlay is exactly as large as the notifications it shows, so it does
+	not block the mouse elsewhere on the screen, and it is hidden while there
+	are no notifications. It does not take the focus from the active window.
+
+	Usually there is one overlay per screen, which is obtained with
+	instance()::
+
+		QNotificationOverlay.instance().display('Export finished', 'success')
+		# On the screen that shows a given window
+		QNotificationOverlay.instance(window).display('Saved', 'info')
+	"""
+
+	_instances = {}
+
+	areaOptions = {}
+	""" Keyword arguments for the notification areas of the overlays that are
+	created by instance(), such as maxMessages or ttl. Must be set before the
+	first call of instance(). """
+
+	def __init__(self, screen=None, position=u'top-right', width=380,
+		margin=16, **kwargs):
+		"""Constructor
+
+		Parameters
+		----------
+		screen : QtGui.QScreen, optional
+			The screen to show the notifications on. Defaults to the primary
+			screen.
+		position : {'top-right', 'top-left', 'bottom-right', 'bottom-left'}
+			The corner of the screen in which the notifications are shown. At
+			the bottom, new notifications are still added below the others,
+			and the overlay grows upwards.
+		width : int (default: 380)
+			The width of the notifications
+		margin : int (default: 16)
+			The distance to the edges of the available area of the screen
+		**kwargs
+			Passed on to the QNotificationArea of the overlay
+
+		Raises
+		------
+		ValueError
+			If position is not one of POSITIONS
+		"""
+		if position not in POSITIONS:
+			raise ValueError(u'\"{}\" is not a valid position. '
+				'Should be one of {}'.format(position, str(POSITIONS)))
+		super(QNotificationOverlay, self).__init__(None,
+			QtCore.Qt.Tool | QtCore.Qt.FramelessWindowHint |
+			QtCore.Qt.WindowStaysOnTopHint |
+			QtCore.Qt.WindowDoesNotAcceptFocus)
+		self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
+		self.setAttribute(QtCore.Qt.WA_ShowWithoutActivating)
+		if screen is None:
+			screen = QtWidgets.QApplication.primaryScreen()
+		self.position = position
+		self.margin = margin
+		self._screen = None
+		self.resize(width, 0)
+		self.area = _OverlayArea(self, **kwargs)
+		self.area.setFixedWidth(width)
+		self.area.installEventFilter(self)
+		self.setScreen(screen)
+
+	@classmethod
+	def instance(cls, screen=None):
+		""" Returns the overlay shared by the whole application for a screen,
+		which is created on first use with areaOptions.
+
+		Parameters
+		----------
+		screen : QtGui.QScreen or QtWidgets.QWidget, optional
+			The screen, or a widget on the screen. Defaults to the screen of
+			the active window, or to the primary screen if no window is
+			active.
+
+		Returns
+		-------
+		QNotificationOverlay
+		"""
+		if screen is None:
+			screen = QtWidgets.QApplication.activeWindow()
+		if isinstance(screen, QtWidgets.QWidget):
+			handle = screen.window().windowHandle()
+			screen = handle.screen() if handle is not None else None
+		if screen is None:
+			screen = QtWidgets.QApplication.primaryScreen()
+		overlay = cls._instances.get(screen)
+		if overlay is None:
+			if not cls._instances:
+				QtWidgets.QApplication.instance().screenRemoved.connect(
+					cls._on_screen_removed)
+			overlay = cls(screen, **cls.areaOptions)
+			cls._instances[screen] = overlay
+		return overlay
+
+	@classmethod
+	def _on_screen_removed(cls, screen):
+		overlay = cls._instances.pop(screen, None)
+		if overlay is None:
+			return
+		primary = QtWidgets.QApplication.primaryScreen()
+		if primary is None or primary in cls._instances:
+			overlay.close()
+			overlay.deleteLater()
+			return
+		# Keep the notifications, on the screen that is left
+		cls._instances[primary] = overlay
+		overlay.setScreen(primary)
+
+	def display(self, *args, **kwargs):
+		""" Displays a notification. Takes the same arguments as
+		QNotificationArea.display().
+
+		Returns
+		-------
+		QNotificationHandle
+			Refers to the notification
+		"""
+		return self.area.display(*args, **kwargs)
+
+	def screenGeometry(self):
+		""" The available geometry of the screen of the overlay. """
+		return self._screen.availableGeometry()
+
+	def setScreen(self, screen):
+		""" Moves the overlay to another screen.
+
+		Parameters
+		----------
+		screen : QtGui.QScreen
+			The screen
+		"""
+		if self._screen is not None:
+			self._screen.availableGeometryChanged.disconnect(self._place)
+		self._screen = screen
+		screen.availableGeometryChanged.connect(self._place)
+		self._place()
+
+	def _place(self, *args):
+		""" Moves the overlay to its corner, with the size of the area. """
+		geometry = self.screenGeometry()
+		width = self.area.width()
+		height = self.area.height()
+		if self.position.endswith(u'right'):
+			x = geometry.right() + 1 - self.margin - width
+		else:
+			x = geometry.left() + self.margin
+		if self.position.startswith(u'top'):
+			y = geometry.top() + self.margin
+		else:
+			y = geometry.bottom() + 1 - self.margin - height
+		self.setGeometry(x, y, width, height)
+
+	def eventFilter(self, obj, event):
+		""" Internal QT function (do not call directly). """
+		if obj is self.area:
+			if event.type() == QtCore.QEvent.Resize:
+				self._place()
+			elif event.type() == QtCore.QEvent.ShowToParent:
+				self._place()
+				self.show()
+			elif event.type() == QtCore.QEvent.HideToParent:
+				self.hide()
+		return False
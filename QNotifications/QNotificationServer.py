@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import functools
+
+from qtpy import QtCore, QtNetwork
+from QNotifications.client import decode_frames
+from QNotifications.abstractions import *
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+class QNotificationServer(QtCore.QObject):
+	""" Local socket (a Unix domain socket, or a named pipe on Windows) on
+	which other processes can send notifications to a QNotificationArea. Those
+	processes do not need Qt: they can use QNotifications.client, which also
+	describes the protocol.
+
+	All frames that have arrived when the event loop gets to a connection are
+	processed in one go, so a batch of notifications costs a single wakeup of
+	the GUI thread. """
+
+	notificationRejected = QtCore.Signal('QString')
+	""" PyQt signal emitted with a description of the problem when a received
+	notification cannot be displayed. """
+
+	def __init__(self, area, name, parent=None):
+		"""Constructor
+
+		Parameters
+		----------
+		area : QNotificationArea
+			The area to display received notifications in
+		name : str
+			The name of the server. Clients connect to it by this name (see
+			QNotifications.client.server_path()). A stale socket that was left
+			behind by a crashed process with the same name is removed.
+		parent : QtCore.QObject, optional
+			The parent of this object. Defaults to area.
+
+		Raises
+		------
+		IOError
+			if the server cannot listen under the given name
+		"""
+		super(QNotificationServer, self).__init__(
+			area if parent is None else parent)
+		self.area = area
+		self._buffers = {}
+		self.server = QtNetwork.QLocalServer(self)
+		self.server.newConnection.connect(self._on_new_connection)
+		QtNetwork.QLocalServer.removeServer(name)
+		if not self.server.listen(name):
+			raise IOError(u'Cannot listen on {}: {}'.format(name,
+				self.server.errorString()))
+
+	def fullServerName(self):
+		""" Returns the full path of the socket (or pipe) of this server. """
+		return self.server.fullServerName()
+
+	def close(self):
+		""" Stops listening and closes all connections. """
+		self.server.close()
+		for sock in list(self._buffers):
+			sock.abort()
+
+	def _on_new_connection(self):
+		while self.server.hasPendingConnections():
+			sock = self.server.nextPendingConnection()
+			self._buffers[sock] = bytearray()
+			sock.readyRead.connect(functools.partial(self._read, sock))
+			sock.disconnected.connect(
+				functools.partial(self._on_disconnected, sock))
+
+	def _on_disconnected(self, sock):
+		# Data can arrive together with the disconnect
+		self._read(sock)
+		self._buffers.pop(sock, None)
+		sock.deleteLater()
+
+	def _read(self, sock):
+		buf = self._buffers.get(sock)
+		if buf is None:
+			return
+		buf += bytes(sock.readAll())
+		try:
+			payloads = decode_frames(buf)
+		except ValueError as e:
+			self.notificationRejected.emit(safe_decode(e))
+			self._buffers.pop(sock, None)
+			sock.abort()
+			return
+		for payload in payloads:
+			if not isinstance(payload, list):
+				payload = [payload]
+			for item in payload:
+				self._display(item)
+
+	def _display(self, item):
+		try:
+			self.area.display(*_parse_notification(item))
+		except (ValueError, KeyError, TypeError) as e:
+			self.notificationRejected.emit(u'Invalid notification {!r}: {}'.format(
+				item, safe_decode(e)))
+
+
+def _parse_notification(item):
+	""" Checks a received notification, and returns the arguments for
+	QNotificationArea.display().
+
+	Raises
+	------
+	ValueError
+		if a key is missing or has a value of the wrong type
+	"""
+	if not isinstance(item, dict):
+		raise ValueError(u'expected an object')
+	for key in (u'message', u'category'):
+		if key not in item:
+			raise ValueError(u'{} is missing'.format(key))
+		if not isinstance(item[key], str):
+			raise ValueError(u'{} should be a string'.format(key))
+	timeout = item.get(u'timeout', 5000)
+	# bool is a subclass of int
+	if timeout is not None and (type(timeout) is bool or
+		not isinstance(timeout, int) or timeout < 0):
+		raise ValueError(u'timeout should be a positive integer or null')
+	autohide = item.get(u'autohide', False)
+	if type(autohide) is not bool:
+		raise ValueError(u'autohide should be a boolean')
+	buttontext = item.get(u'buttontext')
+	if buttontext is not None and not isinstance(buttontext, str):
+		raise ValueError(u'buttontext should be a string or null')
+	return item[u'message'], item[u'category'], timeout, autohide, buttontext
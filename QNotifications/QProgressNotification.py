@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+from qtpy import QtWidgets, QtCore
+from QNotifications.QNotification import QNotification
+from QNotifications.QNotificationHandle import QNotificationHandle
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+class QProgressHandle(QNotificationHandle):
+	""" Refers to a progress notification, as returned by
+	QNotificationArea.displayProgress(). setProgress() and finish() may be
+	called from any thread, as often as needed: they only store the latest
+	value, which the notification samples at a limited rate.
+
+	Example::
+
+		handle = qna.displayProgress('Converting files', maximum=len(files))
+		for i, path in enumerate(files):
+			convert(path)
+			handle.setProgress(i + 1)
+		handle.finish(True, 'Converted {} files'.format(len(files)))
+	"""
+
+	def __init__(self, message, category=u'info', maximum=100,
+		completionTimeout=5000, buttontext=None, refreshRate=20):
+		"""Constructor
+
+		Parameters
+		----------
+		message : str
+			The message to show
+		category : {'primary', 'success', 'info', 'warning', 'danger'}
+			The type of notification while the task is running
+		maximum : int (default: 100)
+			The value at which the task is complete. If 0, the progress bar
+			shows a busy indicator.
+		completionTimeout : int or None (default: 5000)
+			The time the notification stays visible after finish() is called
+		buttontext : str, optional
+			The text of the closing button
+		refreshRate : int (default: 20)
+			The maximum number of times per second the notification is
+			refreshed
+		"""
+		super(QProgressHandle, self).__init__(message, category, None, False,
+			buttontext)
+		self.maximum = maximum
+		self.completionTimeout = completionTimeout
+		self.refreshRate = refreshRate
+		self._lock = threading.Lock()
+		self._value = 0
+		self._newMessage = None
+		self._success = None
+		# Incremented on every change, so that the notification can cheaply
+		# check whether anything happened since it last looked.
+		self._version = 0
+
+	def setProgress(self, value, message=None):
+		""" Sets the progress. Can be called from any thread.
+
+		Parameters
+		----------
+		value : int
+			The progress, between 0 and maximum
+		message : str, optional
+			A new message to show
+		"""
+		with self._lock:
+			self._value = value
+			if message is not None:
+				self._newMessage = message
+			self._version += 1
+
+	def finish(self, success=True, message=None):
+		""" Marks the task as finished. The notification then changes to the
+		success or danger category and disappears after completionTimeout. Can
+		be called from any thread.
+
+		Parameters
+		----------
+		success : bool (default: True)
+			Whether the task succeeded
+		message : str, optional
+			A new message to show
+		"""
+		with self._lock:
+			if success:
+				self._value = self.maximum
+			self._success = bool(success)
+			if message is not None:
+				self._newMessage = message
+			self._version += 1
+
+	def isFinished(self):
+		""" Returns True if finish() has been called. """
+		return self._success is not None
+
+	def _take(self):
+		""" Returns (version, value, message, success) and clears the message.
+		"""
+		with self._lock:
+			message = self._newMessage
+			self._newMessage = None
+			return self._version, self._value, message, self._success
+
+
+class QProgressNotification(QNotification):
+	""" Notification with a progress bar below its message, which shows the
+	progress reported to a QProgressHandle. The handle is sampled by a timer
+	at the refresh rate of the handle, and the bar is only updated when the
+	value has changed by at least a pixel. """
+
+	completed = QtCore.Signal(bool, 'QString')
+	""" PyQt signal emitted once the notification has shown that its task has
+	finished, with the success flag and the final message (empty if the
+	message did not change). """
+
+	def __init__(self, handle, *args, **kwargs):
+		"""Constructor
+
+		Parameters
+		----------
+		handle : QProgressHandle
+			The handle to take the progress from
+		*args, **kwargs
+			Passed on to QNotification
+		"""
+		super(QProgressNotification, self).__init__(handle.text(),
+			handle.category, None, False, handle.buttontext, *args, **kwargs)
+		self.handle = handle
+		self.progressBar = QtWidgets.QProgressBar()
+		self.progressBar.setObjectName(u"progressBar")
+		self.progressBar.setRange(0, handle.maximum)
+		self.progressBar.setTextVisible(False)
+		self.progressBar.setMaximumHeight(6)
+		# Put the bar below the message
+		self.messageColumn.addWidget(self.progressBar)
+
+		self._version = None
+		self._step = None
+		self._finished = False
+		self.sampleTimer = self.clock.createTimer(self)
+		self.sampleTimer.setInterval(max(1, 1000 // max(1, handle.refreshRate)))
+		self.sampleTimer.timeout.connect(self.sample)
+
+	def display(self):
+		""" Displays the notification and starts sampling the progress. """
+		super(QProgressNotification, self).display()
+		self.sampleTimer.start()
+
+	def sample(self):
+		""" Applies the latest progress reported to the handle. Called by
+		the sampling timer. """
+		if self._finished or not self.isVisible():
+			return
+		version, value, message, success = self.handle._take()
+		if version == self._version and message is None:
+			return
+		self._version = version
+		if message is not None:
+			self.setMessage(message)
+			self.handle.message = message
+		maximum = self.handle.maximum
+		if maximum:
+			# Only repaint the bar if the change is visible
+			step = int(min(value, maximum) * self.progressBar.width() // maximum)
+			if step != self._step:
+				self._step = step
+				self.progressBar.setValue(value)
+		if success is not None:
+			self._finished = True
+			self.sampleTimer.stop()
+			if not maximum:
+				self.progressBar.setRange(0, 1)
+				self.progressBar.setValue(1 if success else 0)
+			self.completed.emit(success, message or u'')
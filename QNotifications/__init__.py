@@ -20,6 +20,77 @@ along with this module.>.
 __version__ = "2.0.6"
 __author__ = "Daniel Schreij (dschreij@gmail.com)"
 
-# Do some base imports
-from QNotifications.QNotificationArea import QNotificationArea
-from QNotifications.QNotification import QNotification
+# The classes are imported from their modules on first use, so that importing
+# a module that does not need Qt, such as QNotifications.client, does not
+# import Qt either.
+_exports = {
+	u'QNotificationArea': u'QNotificationArea',
+	u'ANIMATION_FULL': u'QNotificationArea',
+	u'ANIMATION_REDUCED': u'QNotificationArea',
+	u'ANIMATION_OFF': u'QNotificationArea',
+	u'QNotification': u'QNotification',
+	u'QProgressNotification': u'QProgressNotification',
+	u'QProgressHandle': u'QProgressNotification',
+	u'QNotificationHandle': u'QNotificationHandle',
+	u'OUTCOME_CLICKED': u'QNotificationHandle',
+	u'OUTCOME_DISMISSED': u'QNotificationHandle',
+	u'OUTCOME_TIMED_OUT': u'QNotificationHandle',
+	u'OUTCOME_DROPPED': u'QNotificationHandle',
+	u'OUTCOME_REPLACED': u'QNotificationHandle',
+	u'OUTCOME_EXPIRED': u'QNotificationHandle',
+	u'QNotificationHistory': u'QNotificationHistory',
+	u'QNotificationCenter': u'QNotificationCenter',
+	u'QNotificationHistoryModel': u'QNotificationCenter',
+	u'QNotificationServer': u'QNotificationServer',
+	u'QNotificationManager': u'QNotificationManager',
+	u'QNotificationOverlay': u'QNotificationOverlay',
+	u'QNotificationLogHandler': u'QNotificationLogHandler',
+	u'QtClock': u'clock',
+	u'VirtualClock': u'clock',
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+	module = _exports.get(name)
+	if module is None:
+		raise AttributeError(u'module {!r} has no attribute {!r}'.format(
+			__name__, name))
+	import importlib
+	value = getattr(importlib.import_module(u'QNotifications.' + module), name)
+	globals()[name] = value
+	return value
+
+
+def __dir__():
+	return sorted(set(globals()) | set(_exports))
+
+
+import sys
+import types as _types
+
+
+class _Package(_types.ModuleType):
+	""" Importing a submodule binds it to the package, where it would hide the
+	class of the same name (QNotifications.QNotificationArea, for example).
+	Such bindings are left out, so that the class is found instead. """
+
+	def __setattr__(self, name, value):
+		if isinstance(value, _types.ModuleType) and _exports.get(name) == name:
+			return
+		super(_Package, self).__setattr__(name, value)
+
+
+if sys.version_info < (3, 7):
+	# Module __getattr__ is not supported, so the classes are imported right
+	# away, as long as the Qt bindings are available.
+	try:
+		for _name in __all__:
+			__getattr__(_name)
+	except ImportError:
+		if sys.modules.get(u'qtpy') is not None:
+			raise
+else:
+	sys.modules[__name__].__class__ = _Package
+del sys
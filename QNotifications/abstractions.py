@@ -3,6 +3,7 @@
 Created on Fri Mar 11 13:11:14 2016
 
 """
+import codecs
 import sys
 from qtpy import QtCore
 
@@ -17,10 +18,18 @@ else:
 	universal_newline_mode = u'rU'
 
 def safe_decode(s, enc='utf-8', errors='strict'):
+	# Fast path for the common types, without isinstance() checks
+	cls = type(s)
+	if cls is str:
+		return s
+	if cls is bytes:
+		return s.decode(enc, errors)
 	if isinstance(s, str):
 		return s
-	if isinstance(s, bytes):
+	if isinstance(s, (bytes, bytearray)):
 		return s.decode(enc, errors)
+	if isinstance(s, memoryview):
+		return s.tobytes().decode(enc, errors)
 	# Numeric values are encoded right away
 	if isinstance(s, int) or isinstance(s, float):
 		return str(s)
@@ -31,13 +40,18 @@ def safe_decode(s, enc='utf-8', errors='strict'):
 	# Presumably, there is a better way to do this, but for now this at
 	# least gives sensible results.
 	try:
-		return safe_decode(bytes(s), enc=enc, errors=errors)
-	except:
+		return bytes(s).decode(enc, errors)
+	except Exception:
 		pass
 	# For other types, the unicode representation doesn't require a specific
 	# encoding. This mostly applies to non-stringy things, such as integers.
 	return str(s)
 
+def decode_prefix(s, enc='utf-8', errors='replace'):
+	# Decodes the start of a byte string that may end in the middle of a
+	# character. The incomplete character is left out.
+	return codecs.getincrementaldecoder(enc)(errors).decode(bytes(s))
+
 def safe_encode(s, enc='utf-8', errors='strict'):
 	if isinstance(s, bytes):
 		return s
@@ -48,7 +62,7 @@ if py3:
 else:
 	safe_str = safe_encode
 
-__all__ = ['py3', 'safe_decode', 'safe_encode', 'safe_str',
+__all__ = ['py3', 'decode_prefix', 'safe_decode', 'safe_encode', 'safe_str',
 	'universal_newline_mode']
 if not py3:
 	__all__ += ['str', 'bytes']
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Client for QNotificationServer, to send notifications from other processes.
+
+This module only uses the standard library, so it can be used in processes
+that do not (and should not) import Qt. It does not import anything from the
+rest of QNotifications either, so it can also be copied into projects that do
+not depend on QNotifications at all.
+
+Wire protocol
+-------------
+A connection carries a sequence of frames. Each frame consists of a 4-byte
+big-endian unsigned length, followed by that many bytes of UTF-8 encoded JSON.
+The JSON document is either a single notification or a list of notifications.
+A notification is an object with the keys of QNotificationArea.display():
+message and category (required strings), and timeout (an integer of at least
+0, or null), autohide (a boolean) and buttontext (a string or null), which are
+optional. The server rejects notifications with values of other types.
+"""
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+HEADER = struct.Struct(u'>I')
+""" The header preceding every frame: the payload length in bytes """
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+""" The maximum payload size of a frame that a server accepts """
+
+
+def encode_frame(payload):
+	""" Encodes a notification, or a list of notifications, as a frame.
+
+	Parameters
+	----------
+	payload : dict or list of dicts
+		The notification(s) to encode
+
+	Returns
+	-------
+	bytes
+		The frame
+	"""
+	data = json.dumps(payload, separators=(u',', u':')).encode(u'utf-8')
+	if len(data) > MAX_FRAME_SIZE:
+		raise ValueError(u'Frame exceeds the maximum size of {} bytes'.format(
+			MAX_FRAME_SIZE))
+	return HEADER.pack(len(data)) + data
+
+
+def decode_frames(buf):
+	""" Decodes all complete frames at the start of a buffer.
+
+	Parameters
+	----------
+	buf : bytearray
+		The received data. Decoded frames are removed from it.
+
+	Returns
+	-------
+	list
+		The decoded payloads
+
+	Raises
+	------
+	ValueError
+		if a frame exceeds MAX_FRAME_SIZE or does not contain valid JSON
+	"""
+	payloads = []
+	pos = 0
+	while len(buf) - pos >= HEADER.size:
+		(length,) = HEADER.unpack_from(buf, pos)
+		if length > MAX_FRAME_SIZE:
+			raise ValueError(u'Frame exceeds the maximum size of {} bytes'.format(
+				MAX_FRAME_SIZE))
+		end = pos + HEADER.size + length
+		if len(buf) < end:
+			break
+		payloads.append(json.loads(
+			bytes(buf[pos + HEADER.size:end]).decode(u'utf-8')))
+		pos = end
+	del buf[:pos]
+	return payloads
+
+
+def server_path(name):
+	""" Determines the socket path (or pipe name on Windows) of a server, in
+	the same way as QLocalServer does. For names that are not absolute paths,
+	this assumes that Qt and Python agree on the temporary directory, so it is
+	safest to pass QNotificationServer.fullServerName().
+
+	Parameters
+	----------
+	name : str
+		The name that was passed to QNotificationServer, or its full name
+
+	Returns
+	-------
+	str
+		The path to connect to
+	"""
+	if sys.platform.startswith(u'win'):
+		if name.startswith(u'\\\\.\\pipe\\'):
+			return name
+		return u'\\\\.\\pipe\\' + name
+	if name.startswith(u'/'):
+		return name
+	return os.path.join(tempfile.gettempdir(), name)
+
+
+def notification(message, category, timeout=5000, autohide=False,
+	buttontext=None):
+	""" Creates a notification to pass to QNotificationClient.sendBatch(). The
+	arguments are those of QNotificationArea.display(). """
+	item = {u'message': message, u'category': category, u'timeout': timeout}
+	if autohide:
+		item[u'autohide'] = True
+	if buttontext:
+		item[u'buttontext'] = buttontext
+	return item
+
+
+class QNotificationClient(object):
+	""" Connection to a QNotificationServer. Can be used as a context manager.
+
+	Example::
+
+		with QNotificationClient(u'myapp-notifications') as client:
+			client.send(u'Job 12 finished', u'success')
+			client.sendBatch([
+				notification(u'Job 13 failed', u'danger', None),
+				notification(u'Job 14 finished', u'success'),
+			])
+	"""
+
+	def __init__(self, name):
+		"""Constructor
+
+		Parameters
+		----------
+		name : str
+			The name of the server (see server_path())
+
+		Raises
+		------
+		IOError
+			if the server cannot be reached
+		"""
+		path = server_path(name)
+		if sys.platform.startswith(u'win'):
+			self._sock = None
+			self._pipe = open(path, u'wb', 0)
+		else:
+			self._pipe = None
+			self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			try:
+				self._sock.connect(path)
+			except:
+				self._sock.close()
+				raise
+
+	def _write(self, frame):
+		if self._sock is not None:
+			self._sock.sendall(frame)
+		else:
+			self._pipe.write(frame)
+
+	def send(self, message, category, timeout=5000, autohide=False,
+		buttontext=None):
+		""" Sends a single notification. The arguments are those of
+		QNotificationArea.display(). """
+		self._write(encode_frame(notification(message, category, timeout,
+			autohide, buttontext)))
+
+	def sendBatch(self, notifications):
+		""" Sends several notifications in a single frame, which the server
+		processes in one go.
+
+		Parameters
+		----------
+		notifications : list of dicts
+			The notifications, for instance created with notification()
+		"""
+		notifications = list(notifications)
+		if notifications:
+			self._write(encode_frame(notifications))
+
+	def close(self):
+		""" Closes the connection. """
+		if self._sock is not None:
+			self._sock.close()
+			self._sock = None
+		if self._pipe is not None:
+			self._pipe.close()
+			self._pipe = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
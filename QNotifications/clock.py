@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Clocks that notification areas and notifications take their time from.
+
+By default, timeouts, times to live, the latency target and the fade
+animations run in real time, using the timers of Qt (QtClock). A VirtualClock
+only moves when it is advanced, which makes the behavior of an area
+deterministic, and lets tests and benchmarks go through hours of notifications
+in an instant::
+
+	clock = VirtualClock()
+	qna = QNotificationArea(window, clock=clock)
+	handle = qna.display('Saved', 'info', 5000)
+	clock.advance(5000)
+	assert handle.outcome == OUTCOME_TIMED_OUT
+"""
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import functools
+import heapq
+import itertools
+
+from qtpy import QtCore
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+class QtClock(object):
+	""" Real time, with the timers and animations of Qt. """
+
+	def __init__(self):
+		self._clock = QtCore.QElapsedTimer()
+		self._clock.start()
+
+	def elapsed(self):
+		""" Returns the time in ms since the clock was created. """
+		return self._clock.elapsed()
+
+	def createTimer(self, parent=None):
+		""" Returns a new timer, with the interface of QTimer.
+
+		Parameters
+		----------
+		parent : QtCore.QObject, optional
+			The parent of the timer
+		"""
+		return QtCore.QTimer(parent)
+
+	def singleShot(self, msec, callback):
+		""" Calls callback once after msec ms. """
+		QtCore.QTimer.singleShot(msec, callback)
+
+	def startAnimation(self, animation):
+		""" Starts a QAbstractAnimation. """
+		animation.start()
+
+
+default_clock = QtClock()
+""" The clock used when no clock is passed """
+
+
+class VirtualTimer(QtCore.QObject):
+	""" Timer of a VirtualClock. Implements the part of the interface of
+	QTimer that is used by QNotifications. """
+
+	timeout = QtCore.Signal()
+
+	def __init__(self, clock, parent=None):
+		super(VirtualTimer, self).__init__(parent)
+		self._clock = clock
+		self._interval = 0
+		self._singleShot = False
+		# The scheduled entry of the clock (see VirtualClock._schedule()), in
+		# a list that is shared with the destroyed handler.
+		self._entry = [None]
+		self.destroyed.connect(functools.partial(_cancel_entry, self._entry))
+
+	def setInterval(self, msec):
+		self._interval = msec
+
+	def interval(self):
+		return self._interval
+
+	def setSingleShot(self, singleShot):
+		self._singleShot = singleShot
+
+	def isSingleShot(self):
+		return self._singleShot
+
+	def setTimerType(self, timerType):
+		# Virtual time is exact
+		pass
+
+	def start(self, msec=None):
+		if msec is not None:
+			self._interval = msec
+		self.stop()
+		self._entry[0] = self._clock._schedule(self._interval, self._fire)
+
+	def stop(self):
+		_cancel_entry(self._entry)
+
+	def isActive(self):
+		return self._entry[0] is not None
+
+	def remainingTime(self):
+		if self._entry[0] is None:
+			return -1
+		return max(0, self._entry[0][0] - self._clock.elapsed())
+
+	def _fire(self):
+		self._entry[0] = None
+		if not self._singleShot:
+			self._entry[0] = self._clock._schedule(self._interval, self._fire)
+		self.timeout.emit()
+
+
+def _cancel_entry(holder, *args):
+	if holder[0] is not None:
+		holder[0][2] = None
+		holder[0] = None
+
+
+def _forget(holder, *args):
+	holder[0] = None
+
+
+class VirtualClock(object):
+	""" A clock that only moves when advance() is called. Timers fire, and
+	animations progress, in the order of their deadlines while the clock is
+	advanced. """
+
+	def __init__(self):
+		self._now = 0
+		# Entries of [deadline, sequence number, callback]. The callback of a
+		# cancelled entry is None.
+		self._entries = []
+		self._seq = itertools.count()
+		# Running animations, with their start times
+		self._animations = []
+
+	def elapsed(self):
+		""" Returns the virtual time in ms. """
+		return self._now
+
+	def createTimer(self, parent=None):
+		""" Returns a new VirtualTimer.
+
+		Parameters
+		----------
+		parent : QtCore.QObject, optional
+			The parent of the timer
+		"""
+		return VirtualTimer(self, parent)
+
+	def singleShot(self, msec, callback):
+		""" Calls callback once, when the clock has advanced by msec ms. """
+		self._schedule(msec, callback)
+
+	def startAnimation(self, animation):
+		""" Starts a QAbstractAnimation, which is then moved along with the
+		clock instead of by the animation timer of Qt. """
+		self._animations = [(holder, start) for holder, start in
+			self._animations if holder[0] is not animation]
+		animation.start()
+		animation.pause()
+		holder = [animation]
+		animation.destroyed.connect(functools.partial(_forget, holder))
+		self._animations.append((holder, self._now))
+		# Makes sure that advance() stops at the end of the animation
+		self._schedule(animation.totalDuration(), self._update_animations)
+
+	def advance(self, msec):
+		""" Moves the clock forward by msec ms, firing the timers that are
+		due on the way.
+
+		Parameters
+		----------
+		msec : int
+			The time to advance by
+		"""
+		end = self._now + msec
+		entries = self._entries
+		while entries and entries[0][0] <= end:
+			deadline, seq, callback = heapq.heappop(entries)
+			if callback is None:
+				continue
+			self._now = max(self._now, deadline)
+			self._update_animations()
+			callback()
+		self._now = end
+		self._update_animations()
+
+	def timeToNext(self):
+		""" Returns the time in ms until the next timer fires, or None if no
+		timer is running. """
+		while self._entries and self._entries[0][2] is None:
+			heapq.heappop(self._entries)
+		if not self._entries:
+			return None
+		return max(0, self._entries[0][0] - self._now)
+
+	def _schedule(self, msec, callback):
+		entry = [self._now + max(0, msec), next(self._seq), callback]
+		heapq.heappush(self._entries, entry)
+		return entry
+
+	def _update_animations(self):
+		# Handlers of finished may start other animations
+		animations = self._animations
+		self._animations = []
+		running = []
+		for holder, start in animations:
+			animation = holder[0]
+			if animation is None or \
+				animation.state() == QtCore.QAbstractAnimation.Stopped:
+				continue
+			# Stops the animation, and emits finished, at the end
+			animation.setCurrentTime(min(self._now - start,
+				animation.totalDuration()))
+			if animation.state() != QtCore.QAbstractAnimation.Stopped:
+				running.append((holder, start))
+		restarted = set(id(holder[0]) for holder, start in self._animations)
+		self._animations = [(holder, start) for holder, start in running
+			if id(holder[0]) not in restarted] + self._animations
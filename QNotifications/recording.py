@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Recording and replay of the notifications of a QNotificationArea.
+
+A recording is a JSON lines file. The first line describes the area that
+was recorded, and every following line is a call to display(), replace(),
+updateNotification() or remove() of that area, with the time in ms since the
+start of the recording (t), the name of the call (op) and its arguments.
+Notifications are referred to by the ids of their handles.
+
+Start a recording with QNotificationArea.startRecording(), and replay it
+with QNotificationReplay, or from the command line::
+
+	python -m QNotifications.recording incident.jsonl --speed 10
+"""
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import collections
+import io
+import json
+import os
+import sys
+
+from qtpy import QtWidgets, QtCore, QtGui
+from QNotifications.abstractions import *
+from QNotifications.clock import default_clock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+FORMAT_VERSION = 1
+""" The version of the recording format """
+
+
+class QNotificationRecorder(object):
+	""" Writes the calls made to a notification area to a file. Used by
+	QNotificationArea.startRecording(). """
+
+	def __init__(self, path, settings=None, clock=None):
+		"""Constructor
+
+		Parameters
+		----------
+		path : str
+			The file to write to. An existing file is overwritten.
+		settings : dict, optional
+			Settings of the area, stored in the first line of the file
+		clock : QtClock or VirtualClock, optional
+			The clock to take the times from. Defaults to real time.
+		"""
+		self._file = io.open(path, u'w', encoding=u'utf-8')
+		self._clock = clock or default_clock
+		self._start = self._clock.elapsed()
+		self._write({u'op': u'start', u'version': FORMAT_VERSION,
+			u'settings': settings or {}})
+
+	def record(self, op, **fields):
+		""" Writes a call to the file.
+
+		Parameters
+		----------
+		op : str
+			The name of the call
+		**fields
+			The arguments of the call
+		"""
+		fields[u't'] = self._clock.elapsed() - self._start
+		fields[u'op'] = op
+		self._write(fields)
+
+	def _write(self, item):
+		self._file.write(safe_decode(json.dumps(item, separators=(u',', u':'))))
+		self._file.write(u'\n')
+
+	def close(self):
+		""" Closes the file. """
+		self._file.close()
+
+
+def read_recording(path):
+	""" Reads a recording.
+
+	Parameters
+	----------
+	path : str
+		The file to read
+
+	Returns
+	-------
+	tuple
+		The settings of the recorded area (a dict), and the list of recorded
+		calls, as dicts
+
+	Raises
+	------
+	ValueError
+		if the file is not a recording, or was written by a newer version
+	"""
+	settings = None
+	events = []
+	with io.open(path, encoding=u'utf-8') as f:
+		for line in f:
+			line = line.strip()
+			if not line:
+				continue
+			item = json.loads(line)
+			if settings is None:
+				if item.get(u'op') != u'start':
+					raise ValueError(u'{} is not a notification recording'.format(
+						path))
+				if item.get(u'version', 0) > FORMAT_VERSION:
+					raise ValueError(u'{} was recorded with a newer version'.format(
+						path))
+				settings = item.get(u'settings', {})
+				continue
+			events.append(item)
+	if settings is None:
+		raise ValueError(u'{} is not a notification recording'.format(path))
+	return settings, events
+
+
+class QNotificationReplay(QtCore.QObject):
+	""" Repeats the calls of a recording on a notification area, at the
+	recorded times or faster. When the recording is sped up, the timeouts and
+	times to live of the notifications are shortened by the same factor, so
+	that the area goes through the same states. """
+
+	finished = QtCore.Signal()
+	""" PyQt signal emitted when all calls have been made. """
+
+	def __init__(self, area, path, speed=1.0, parent=None):
+		"""Constructor
+
+		Parameters
+		----------
+		area : QNotificationArea
+			The area to replay the recording on
+		path : str
+			The recording
+		speed : float (default: 1.0)
+			The factor by which the replay is faster than the recording
+		parent : QtCore.QObject, optional
+			The parent of this object
+		"""
+		super(QNotificationReplay, self).__init__(parent)
+		self.area = area
+		self.speed = float(speed)
+		self.settings, self.events = read_recording(path)
+		# The handles of the replayed notifications, by recorded id
+		self.handles = {}
+		self._index = 0
+		self._clock = QtCore.QElapsedTimer()
+		self._timer = QtCore.QTimer(self)
+		self._timer.setSingleShot(True)
+		self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+		self._timer.timeout.connect(self._on_timer)
+
+	def start(self):
+		""" Starts the replay. """
+		self._index = 0
+		self._clock.start()
+		self._on_timer()
+
+	def isFinished(self):
+		""" Returns True if all calls have been made. """
+		return self._index == len(self.events)
+
+	def _on_timer(self):
+		now = self._clock.elapsed() * self.speed
+		events = self.events
+		while self._index < len(events) and events[self._index][u't'] <= now:
+			self._apply(events[self._index])
+			self._index += 1
+		if self._index == len(events):
+			self.finished.emit()
+			return
+		self._timer.start(max(0, int((events[self._index][u't'] - now) /
+			self.speed)))
+
+	def _scale(self, duration):
+		if not duration:
+			return duration
+		return max(1, int(duration / self.speed))
+
+	def _apply(self, event):
+		op = event[u'op']
+		if op == u'display':
+			self.handles[event[u'id']] = self.area.display(event[u'message'],
+				event[u'category'], self._scale(event.get(u'timeout')),
+				event.get(u'autohide', False), event.get(u'buttontext'),
+				ttl=self._scale(event.get(u'ttl')))
+		elif op == u'replace':
+			self.handles[event[u'id']] = self.area.replace(
+				self.handles.get(event.get(u'old')), event[u'message'],
+				event[u'category'], self._scale(event.get(u'timeout')),
+				event.get(u'autohide', False), event.get(u'buttontext'))
+		elif op == u'update':
+			handle = self.handles.get(event[u'id'])
+			if handle is None:
+				return
+			changes = dict((key, event[key]) for key in
+				(u'message', u'category', u'timeout') if key in event)
+			if u'timeout' in changes:
+				changes[u'timeout'] = self._scale(changes[u'timeout'])
+			self.area.updateNotification(handle, **changes)
+		elif op == u'remove':
+			handle = self.handles.get(event[u'id'])
+			if handle is not None:
+				self.area.remove(handle)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog=u'python -m QNotifications.recording',
+		description=u'Replays a recording of notifications in a new area')
+	parser.add_argument(u'path', help=u'the recording')
+	parser.add_argument(u'--speed', type=float, default=1.0,
+		help=u'how many times faster than recorded (default: 1)')
+	parser.add_argument(u'--max-messages', type=int, default=None,
+		help=u'maxMessages of the area (default: as recorded)')
+	parser.add_argument(u'--offscreen', action=u'store_true',
+		help=u'do not show a window')
+	args = parser.parse_args(argv)
+	if args.offscreen:
+		# Must be set before the application is created
+		os.environ[u'QT_QPA_PLATFORM'] = u'offscreen'
+	from QNotifications.QNotificationArea import QNotificationArea
+
+	app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+	settings, events = read_recording(args.path)
+	window = QtWidgets.QWidget()
+	window.resize(800, 600)
+	area = QNotificationArea(window,
+		useQueue=settings.get(u'useQueue', True),
+		maxMessages=args.max_messages or settings.get(u'maxMessages', 2))
+	window.show()
+	if args.offscreen:
+		# Notifications are not shown while the mouse cursor is over the
+		# area, which it is by default without a screen.
+		QtGui.QCursor.setPos(-10000, -10000)
+	replay = QNotificationReplay(area, args.path, args.speed)
+
+	def quit_when_done():
+		# Also wait for the notifications that are still shown or queued
+		if replay.isFinished() and \
+			all(handle.done() for handle in replay.handles.values()):
+			app.quit()
+
+	poll = QtCore.QTimer()
+	poll.timeout.connect(quit_when_done)
+	poll.start(100)
+	timer = QtCore.QElapsedTimer()
+	timer.start()
+	replay.start()
+	app.exec_()
+	outcomes = collections.Counter()
+	for handle in replay.handles.values():
+		outcomes[handle.outcome] += 1
+	print(u'Replayed {} calls in {:.1f} s'.format(len(events),
+		timer.elapsed() / 1000.))
+	for outcome, count in sorted(outcomes.items(), key=lambda i: u'%s' % i[0]):
+		print(u'  {}: {}'.format(outcome, count))
+	print(json.dumps(area.stats()))
+	return 0
+
+
+if __name__ == u'__main__':
+	sys.exit(main())
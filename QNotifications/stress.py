@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Load generator for QNotificationArea.
+
+Displays notifications at a configurable rate in an area on top of a plain
+window, and prints how the application holds up: the lag of the event loop,
+the interval between frames, the depth of the queue and the outcomes of the
+notifications. Run it with::
+
+	python -m QNotifications.stress --rate 200 --duration 20 --threads 4
+
+Use --help to see all options. With --offscreen, no window is shown (this
+requires the offscreen platform plugin of Qt).
+"""
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from qtpy import QtWidgets, QtCore, QtGui
+from QNotifications.QNotificationArea import QNotificationArea
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+WORDS = (u'lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+	u'eiusmod tempor incididunt ut labore et dolore magna aliqua').split()
+# The interval (in ms) at which the event loop lag is measured
+PROBE_INTERVAL = 20
+
+
+def parse_mix(value):
+	""" Parses a category mix such as 'info:5,warning:2,danger:1' into a list
+	of (category, weight) tuples. """
+	mix = []
+	for part in value.split(u','):
+		category, sep, weight = part.partition(u':')
+		mix.append((category.strip(), float(weight) if sep else 1.))
+	return mix
+
+
+def make_message(rng, mean, maximum):
+	""" Returns a message with a length drawn from an exponential
+	distribution with the given mean, but at most maximum characters. """
+	length = min(maximum, max(1, int(rng.expovariate(1. / mean))))
+	words = []
+	size = 0
+	while size < length:
+		word = rng.choice(WORDS)
+		words.append(word)
+		size += len(word) + 1
+	return u' '.join(words)[:length]
+
+
+def parse_args(argv=None):
+	parser = argparse.ArgumentParser(prog=u'python -m QNotifications.stress',
+		description=u'Load generator for QNotificationArea')
+	parser.add_argument(u'--rate', type=float, default=50,
+		help=u'notifications per second, over all producers (default: 50)')
+	parser.add_argument(u'--duration', type=float, default=10,
+		help=u'seconds to produce notifications for (default: 10)')
+	parser.add_argument(u'--drain', type=float, default=5,
+		help=u'seconds to keep measuring after producing (default: 5)')
+	parser.add_argument(u'--threads', type=int, default=0,
+		help=u'producer threads; 0 produces from a timer in the GUI thread '
+		u'(default: 0)')
+	parser.add_argument(u'--mix', type=parse_mix,
+		default=u'info:5,success:2,warning:2,danger:1',
+		help=u'categories with weights (default: '
+		u'info:5,success:2,warning:2,danger:1)')
+	parser.add_argument(u'--length', type=float, default=80,
+		help=u'mean message length in characters (default: 80)')
+	parser.add_argument(u'--max-length', type=int, default=1000,
+		help=u'maximum message length in characters (default: 1000)')
+	parser.add_argument(u'--timeout', type=int, default=5000,
+		help=u'timeout of the notifications in ms (default: 5000)')
+	parser.add_argument(u'--ttl', type=int, default=None,
+		help=u'time to live of queued notifications in ms')
+	parser.add_argument(u'--max-messages', type=int, default=2,
+		help=u'maxMessages of the area (default: 2)')
+	parser.add_argument(u'--no-queue', action=u'store_true',
+		help=u'show all notifications at once (useQueue=False)')
+	parser.add_argument(u'--entry-effect', choices=[u'fadeIn'])
+	parser.add_argument(u'--exit-effect', choices=[u'fadeOut'])
+	parser.add_argument(u'--effect-duration', type=int, default=250,
+		help=u'duration of the effects in ms (default: 250)')
+	parser.add_argument(u'--adaptive-animations', action=u'store_true',
+		help=u'enable adaptive animations')
+	parser.add_argument(u'--frame-budget', type=int, default=None,
+		help=u'frame budget of the area in ms')
+	parser.add_argument(u'--static-text', action=u'store_true',
+		help=u'paint messages from the static text cache')
+	parser.add_argument(u'--pre-layout', action=u'store_true',
+		help=u'lay out queued messages in a worker thread')
+	parser.add_argument(u'--report-interval', type=float, default=1,
+		help=u'seconds between reports (default: 1)')
+	parser.add_argument(u'--seed', type=int, default=None,
+		help=u'seed of the random generator')
+	parser.add_argument(u'--offscreen', action=u'store_true',
+		help=u'do not show a window')
+	parser.add_argument(u'--json', action=u'store_true',
+		help=u'print the reports as JSON lines')
+	return parser.parse_args(argv)
+
+
+class _Bridge(QtCore.QObject):
+	""" Passes notifications from producer threads to the GUI thread. """
+	notify = QtCore.Signal(object)
+
+
+class _FrameFilter(QtCore.QObject):
+	""" Records the interval between repaints of the window. """
+
+	def __init__(self, stress, parent):
+		super(_FrameFilter, self).__init__(parent)
+		self.stress = stress
+
+	def eventFilter(self, obj, event):
+		if event.type() == QtCore.QEvent.UpdateRequest:
+			self.stress.frame()
+		return False
+
+
+class Stress(object):
+	""" Drives a notification area and collects measurements. """
+
+	def __init__(self, args, app):
+		self.args = args
+		self.app = app
+		self.rng = random.Random(args.seed)
+		self.categories = [category for category, weight in args.mix]
+		self.weights = [weight for category, weight in args.mix]
+
+		self.window = QtWidgets.QWidget()
+		self.window.resize(800, 600)
+		self.area = QNotificationArea(self.window,
+			useQueue=not args.no_queue, maxMessages=args.max_messages,
+			frameBudget=args.frame_budget, useStaticText=args.static_text,
+			preLayout=args.pre_layout, ttl=args.ttl)
+		if args.entry_effect:
+			self.area.setEntryEffect(args.entry_effect, args.effect_duration)
+		if args.exit_effect:
+			self.area.setExitEffect(args.exit_effect, args.effect_duration)
+		if args.adaptive_animations:
+			self.area.setAdaptiveAnimations(True)
+		self.window.show()
+		if args.offscreen:
+			# Notifications are not shown while the mouse cursor is over the
+			# area, which it is by default without a screen.
+			QtGui.QCursor.setPos(-10000, -10000)
+
+		# Measurements, reset after every report
+		self.clock = QtCore.QElapsedTimer()
+		self.clock.start()
+		self.lags = []
+		self.frames = []
+		self.lastFrame = None
+		self.maxQueue = 0
+		self.displayed = 0
+		# Totals
+		self.outcomes = collections.Counter()
+		self.produced = 0
+		self.running = True
+
+		self.probe = QtCore.QTimer()
+		self.probe.setTimerType(QtCore.Qt.PreciseTimer)
+		self.probe.timeout.connect(self._probe)
+		self.lastProbe = self.clock.elapsed()
+		self.probe.start(PROBE_INTERVAL)
+		self.window.installEventFilter(_FrameFilter(self, self.window))
+
+		self.reporter = QtCore.QTimer()
+		self.reporter.timeout.connect(self.report)
+		self.reporter.start(int(args.report_interval * 1000))
+
+		self.bridge = _Bridge()
+		self.bridge.notify.connect(self.display)
+		self.threads = []
+		if args.threads:
+			for i in range(args.threads):
+				thread = threading.Thread(target=self._produce,
+					args=(args.rate / args.threads, random.Random(
+					self.rng.random())))
+				thread.daemon = True
+				self.threads.append(thread)
+		else:
+			self.producer = QtCore.QTimer()
+			self.producer.timeout.connect(self._produce_tick)
+			self.producerStart = None
+		QtCore.QTimer.singleShot(int(args.duration * 1000), self.stop_producing)
+		QtCore.QTimer.singleShot(int((args.duration + args.drain) * 1000),
+			self.app.quit)
+
+	def start(self):
+		for thread in self.threads:
+			thread.start()
+		if not self.threads:
+			self.producerStart = time.time()
+			self.producer.start(10)
+
+	def _next(self, rng):
+		return (make_message(rng, self.args.length, self.args.max_length),
+			rng.choices(self.categories, self.weights)[0] \
+			if hasattr(rng, u'choices') else rng.choice(self.categories))
+
+	def _produce(self, rate, rng):
+		""" Produces notifications in a thread. """
+		start = time.time()
+		count = 0
+		while self.running:
+			due = start + count / rate
+			delay = due - time.time()
+			if delay > 0:
+				time.sleep(delay)
+			self.bridge.notify.emit(self._next(rng))
+			count += 1
+
+	def _produce_tick(self):
+		""" Produces the notifications that are due, in the GUI thread. """
+		due = int((time.time() - self.producerStart) * self.args.rate)
+		while self.produced < due:
+			self.display(self._next(self.rng))
+
+	def stop_producing(self):
+		self.running = False
+		if not self.threads:
+			self.producer.stop()
+
+	def display(self, item):
+		if not self.running:
+			return
+		message, category = item
+		handle = self.area.display(message, category, self.args.timeout)
+		self.produced += 1
+		self.displayed += 1
+		if handle.future is not None:
+			handle.future.add_done_callback(self._on_done)
+
+	def _on_done(self, future):
+		self.outcomes[future.result()] += 1
+
+	def _probe(self):
+		now = self.clock.elapsed()
+		self.lags.append(max(0, now - self.lastProbe - PROBE_INTERVAL))
+		self.lastProbe = now
+		queued = len(self.area.queue) if self.area.useQueue else 0
+		self.maxQueue = max(self.maxQueue, queued)
+
+	def frame(self):
+		now = self.clock.elapsed()
+		if self.lastFrame is not None and now - self.lastFrame < 1000:
+			self.frames.append(now - self.lastFrame)
+		self.lastFrame = now
+
+	def report(self, final=False):
+		""" Prints the measurements since the previous report. """
+		lags = sorted(self.lags) or [0]
+		frames = sorted(self.frames) or [0]
+		stats = self.area.stats()
+		row = collections.OrderedDict([
+			(u'time', round(self.clock.elapsed() / 1000., 1)),
+			(u'displayed', self.displayed),
+			(u'shown', self.area._shown_count()),
+			(u'queued', len(self.area.queue) if self.area.useQueue else 0),
+			(u'max_queued', self.maxQueue),
+			(u'lag_mean', round(sum(lags) / len(lags), 1)),
+			(u'lag_max', lags[-1]),
+			(u'frame_p50', frames[len(frames) // 2]),
+			(u'frame_max', frames[-1]),
+			(u'animation_mode', stats[u'animation_mode']),
+		])
+		# The outcomes (timed-out, expired, dropped, ...) so far
+		for outcome, count in sorted(self.outcomes.items()):
+			row[outcome] = count
+		if final:
+			row[u'produced'] = self.produced
+		self.lags = []
+		self.frames = []
+		self.maxQueue = 0
+		self.displayed = 0
+		if self.args.json:
+			print(json.dumps(row))
+		else:
+			print(u'  '.join(u'{}={}'.format(key, value)
+				for key, value in row.items()))
+		sys.stdout.flush()
+
+
+def main(argv=None):
+	args = parse_args(argv)
+	if args.offscreen:
+		# Must be set before the application is created
+		os.environ[u'QT_QPA_PLATFORM'] = u'offscreen'
+	app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+	stress = Stress(args, app)
+	stress.start()
+	app.exec_()
+	stress.report(final=True)
+	return 0
+
+
+if __name__ == u'__main__':
+	sys.exit(main())
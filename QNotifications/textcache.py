@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Caches of prepared text, shared by all notifications.
+"""
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import atexit
+import collections
+import math
+import threading
+import weakref
+
+from qtpy import QtGui, QtCore
+from QNotifications.abstractions import *
+
+try:
+	# Python 3
+	from queue import Queue, Empty
+except:
+	# Python 2
+	from Queue import Queue, Empty
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+class StaticTextCache(object):
+	""" Least recently used cache of QStaticText objects that have been laid
+	out and prepared for a given text, font and width. Painting a message
+	that is in the cache does not require the text to be shaped again. """
+
+	def __init__(self, maxSize=512):
+		"""Constructor
+
+		Parameters
+		----------
+		maxSize : int (default: 512)
+			The maximum number of prepared texts to keep
+		"""
+		self.maxSize = maxSize
+		self._items = collections.OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, text, font, width):
+		""" Returns a prepared QStaticText.
+
+		Parameters
+		----------
+		text : str
+			The text, which may contain (a limited set of) HTML tags
+		font : QtGui.QFont
+			The font to lay out the text with
+		width : int
+			The width at which the text is wrapped, or -1 for no wrapping
+
+		Returns
+		-------
+		QtGui.QStaticText
+			The prepared text. Should not be modified.
+		"""
+		key = (text, font.key(), width)
+		item = self._items.pop(key, None)
+		if item is not None:
+			self.hits += 1
+			self._items[key] = item
+			return item
+		self.misses += 1
+		item = QtGui.QStaticText(text)
+		item.setTextWidth(width)
+		item.prepare(QtGui.QTransform(), font)
+		self._items[key] = item
+		while len(self._items) > self.maxSize:
+			self._items.popitem(last=False)
+		return item
+
+	def clear(self):
+		""" Removes all prepared texts and resets the statistics. """
+		self._items.clear()
+		self.hits = 0
+		self.misses = 0
+
+	def stats(self):
+		""" Returns a dict with the number of hits and misses, and the current
+		and maximum number of cached texts. """
+		return {
+			u'hits': self.hits,
+			u'misses': self.misses,
+			u'size': len(self._items),
+			u'max_size': self.maxSize,
+		}
+
+	def __len__(self):
+		return len(self._items)
+
+
+static_text_cache = StaticTextCache()
+""" The cache shared by all notification areas that use static text """
+
+
+def _close_all():
+	for cache in list(_layout_caches):
+		cache.close()
+
+
+# Worker threads are stopped at exit, before Qt is torn down
+_layout_caches = weakref.WeakSet()
+atexit.register(_close_all)
+
+
+class TextLayoutCache(object):
+	""" Heights of word wrapped messages at the current message widths of a
+	notification area, computed in a worker thread. Messages are laid out
+	while they wait in the queue, so that showing them only requires the
+	cached height to be applied.
+
+	The font and widths are taken from the labels of shown notifications
+	(see setGeometry()). Labels next to a button are narrower than others, so
+	heights are kept for the maxWidths widths that were reported last. When a
+	new width is reported, the messages returned by *source* are laid out at
+	that width too. When the font changes, all results are discarded.
+
+	Messages are passed as they were displayed, and are turned into the text
+	that is laid out (decoded, for instance) in the worker thread as well.
+	Heights are looked up by that text. """
+
+	def __init__(self, source=None, maxSize=4096, preview=None, maxWidths=4):
+		"""Constructor
+
+		Parameters
+		----------
+		source : callable, optional
+			Returns the messages that should be laid out at a new width
+			(usually those of queued notifications).
+		maxSize : int (default: 4096)
+			The maximum number of heights to keep per width. When it is
+			exceeded, the results for that width are discarded.
+		preview : callable, optional
+			Turns a message into the text that is shown for it. Called in the
+			worker thread. Defaults to decoding the message.
+		maxWidths : int (default: 4)
+			The number of widths for which heights are kept
+		"""
+		self.source = source
+		self.maxSize = maxSize
+		self.maxWidths = maxWidths
+		self.preview = safe_decode if preview is None else preview
+		self.font = None
+		# The width that was reported last
+		self.width = None
+		self._generation = 0
+		# Heights by text, per width, from the least to the most recently
+		# reported width
+		self._heights = collections.OrderedDict()
+		self._lock = threading.Lock()
+		self._jobs = None
+		self._thread = None
+		_layout_caches.add(self)
+
+	def setGeometry(self, font, width):
+		""" Sets the font and a width at which messages are laid out. Discards
+		previous results if the font has changed.
+
+		Parameters
+		----------
+		font : QtGui.QFont
+			The font of the message labels
+		width : int
+			The width available for the text in a message label
+		"""
+		if self.font is None or font != self.font:
+			with self._lock:
+				self._generation += 1
+				self._heights = collections.OrderedDict()
+				self.font = QtGui.QFont(font)
+		self.width = width
+		with self._lock:
+			if width in self._heights:
+				self._heights.move_to_end(width)
+				return
+			self._heights[width] = {}
+			while len(self._heights) > self.maxWidths:
+				self._heights.popitem(last=False)
+		if self.source is not None:
+			self._prefetch(self.source(), [width])
+
+	def invalidate(self):
+		""" Discards all results, for instance because the width of the area is
+		about to change. Nothing is laid out until setGeometry() is called
+		again. """
+		with self._lock:
+			self._generation += 1
+			self._heights = collections.OrderedDict()
+			self.width = None
+
+	def prefetch(self, messages):
+		""" Lays out messages in the worker thread, at each of the widths.
+
+		Parameters
+		----------
+		messages : iterable of str or bytes
+			The messages to lay out
+		"""
+		self._prefetch(messages, list(self._heights))
+
+	def _prefetch(self, messages, widths):
+		if not widths:
+			return
+		if self._thread is None:
+			self._jobs = Queue()
+			self._thread = threading.Thread(target=self._run,
+				name=u'QNotifications text layout')
+			self._thread.daemon = True
+			self._thread.start()
+		job = (self._generation, self.font)
+		for message in messages:
+			for width in widths:
+				self._jobs.put(job + (width, message))
+
+	def height(self, text, width):
+		""" Returns the height of text at width, or None if it has not been
+		computed (yet). """
+		heights = self._heights.get(width)
+		if heights is None:
+			return None
+		return heights.get(text)
+
+	def stats(self):
+		""" Returns a dict with the number of cached heights, the width that
+		was reported last and all widths heights are kept for. """
+		heights = list(self._heights.items())
+		return {
+			u'size': sum(len(texts) for width, texts in heights),
+			u'width': self.width,
+			u'widths': [width for width, texts in heights],
+		}
+
+	def close(self):
+		""" Stops the worker thread. Messages that have not been laid out yet
+		are dropped, and the message that is being laid out is finished
+		first. """
+		thread = self._thread
+		if thread is None:
+			return
+		self._thread = None
+		with self._lock:
+			self._generation += 1
+		try:
+			while True:
+				self._jobs.get_nowait()
+		except Empty:
+			pass
+		self._jobs.put(None)
+		if thread is not threading.current_thread():
+			thread.join()
+
+	def _run(self):
+		jobs = self._jobs
+		document = QtGui.QTextDocument()
+		document.setDocumentMargin(0)
+		while True:
+			job = jobs.get()
+			if job is None:
+				return
+			generation, font, width, message = job
+			heights = self._heights.get(width)
+			if generation != self._generation or heights is None:
+				continue
+			try:
+				text = self.preview(message)
+			except Exception:
+				# Left to the GUI thread, which reports the error when the
+				# message is shown
+				continue
+			if text in heights:
+				continue
+			document.setDefaultFont(font)
+			if QtCore.Qt.mightBeRichText(text):
+				document.setHtml(text)
+			else:
+				document.setPlainText(text)
+			document.setTextWidth(width)
+			height = int(math.ceil(document.size().height()))
+			with self._lock:
+				if generation == self._generation and \
+					self._heights.get(width) is heights:
+					if len(heights) >= self.maxSize:
+						heights.clear()
+					heights[text] = height
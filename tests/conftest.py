@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import sys
+
+os.environ.setdefault(u'QT_QPA_PLATFORM', u'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+@pytest.fixture(scope=u'session')
+def qapp():
+	""" The QApplication, which is shared by all tests. """
+	from qtpy import QtWidgets, QtGui
+	app = QtWidgets.QApplication.instance()
+	if app is None:
+		app = QtWidgets.QApplication([])
+	# Notifications are not shown while the mouse is over the area
+	QtGui.QCursor.setPos(-10000, -10000)
+	return app
+
+
+@pytest.fixture
+def window(qapp):
+	""" A shown window to put notification areas in. """
+	from qtpy import QtWidgets, QtCore
+	widget = QtWidgets.QWidget()
+	widget.resize(600, 400)
+	widget.show()
+	yield widget
+	widget.close()
+	widget.deleteLater()
+	QtCore.QCoreApplication.sendPostedEvents(None,
+		QtCore.QEvent.DeferredDelete)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from QNotifications import QNotificationArea, QNotificationManager, \
+	OUTCOME_TIMED_OUT
+from QNotifications.clock import VirtualClock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def _area(window, managed):
+	clock = VirtualClock()
+	manager = QNotificationManager(clock=clock) if managed else None
+	area = QNotificationArea(window, manager=manager, clock=clock,
+		maxChars=20)
+	area.setFixedWidth(600)
+	return area, clock
+
+
+@pytest.mark.parametrize(u'managed', [False, True])
+def test_timeout_paused_while_expanded(window, managed):
+	area, clock = _area(window, managed)
+	handle = area.display(u'A long message ' * 10, u'info', 1000)
+	clock.advance(400)
+	handle.notification.setExpanded(True)
+	clock.advance(5000)
+	assert not handle.done()
+	handle.notification.setExpanded(False)
+	clock.advance(500)
+	assert not handle.done()
+	clock.advance(200)
+	assert handle.outcome == OUTCOME_TIMED_OUT
+
+
+@pytest.mark.parametrize(u'managed', [False, True])
+def test_expanded_while_suspended(window, managed):
+	area, clock = _area(window, managed)
+	handle = area.display(u'A long message ' * 10, u'info', 1000)
+	clock.advance(400)
+	handle.notification.setExpanded(True)
+	area.suspend()
+	area.resume()
+	clock.advance(5000)
+	assert not handle.done()
+	area.suspend()
+	handle.notification.setExpanded(False)
+	clock.advance(5000)
+	assert not handle.done()
+	area.resume()
+	clock.advance(500)
+	assert not handle.done()
+	clock.advance(200)
+	assert handle.outcome == OUTCOME_TIMED_OUT
+
+
+@pytest.mark.parametrize(u'managed', [False, True])
+def test_update_while_expanded(window, managed):
+	area, clock = _area(window, managed)
+	handle = area.display(u'A long message ' * 10, u'info', 1000)
+	handle.notification.setExpanded(True)
+	area.updateNotification(handle, timeout=2000)
+	clock.advance(5000)
+	assert not handle.done()
+	handle.notification.setExpanded(False)
+	clock.advance(1900)
+	assert not handle.done()
+	clock.advance(200)
+	assert handle.outcome == OUTCOME_TIMED_OUT
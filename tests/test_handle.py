@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import asyncio
+
+from QNotifications import QNotificationArea, OUTCOME_TIMED_OUT
+from QNotifications.clock import VirtualClock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def _area(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, clock=clock)
+	area.setFixedWidth(600)
+	return area, clock
+
+
+def test_future(window):
+	area, clock = _area(window)
+	handle = area.display(u'Saved', u'info', 1000)
+	assert not handle.future.done()
+	clock.advance(1100)
+	assert handle.result(0) == OUTCOME_TIMED_OUT
+
+
+def test_cancelled_future(window):
+	area, clock = _area(window)
+	handle = area.display(u'Saved', u'info', 1000)
+	notification = handle.notification
+	assert handle.future.cancel()
+	clock.advance(1100)
+	assert handle.outcome == OUTCOME_TIMED_OUT
+	assert handle.future.cancelled()
+	assert notification.isBeingRemoved
+
+
+def test_await_with_timeout(window):
+	area, clock = _area(window)
+	handle = area.display(u'Saved', u'info', 1000)
+
+	async def wait():
+		try:
+			await asyncio.wait_for(handle, 0.01)
+		except asyncio.TimeoutError:
+			return True
+		return False
+
+	assert asyncio.run(wait())
+	assert handle.future.cancelled()
+	clock.advance(1100)
+	assert handle.outcome == OUTCOME_TIMED_OUT
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from QNotifications import QNotificationArea, QNotificationHistory, \
+	QNotificationManager
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def test_entries(qapp):
+	history = QNotificationHistory(maxEntries=10)
+	for i in range(25):
+		history.add(u'Message {}'.format(i), u'info', timestamp=i)
+	assert history.lastSeq == 24
+	assert 10 <= len(history) <= 11
+	assert history.entry(24) == (24, u'info', u'Message 24')
+	assert history.entry(0) is None
+
+
+def test_bytes_are_decoded(qapp):
+	history = QNotificationHistory()
+	seq = history.add(u'café'.encode(u'utf-8'), u'info', timestamp=0)
+	assert history.entry(seq)[2] == u'café'
+
+
+def test_no_entries(qapp):
+	history = QNotificationHistory(maxEntries=0)
+	added = []
+	history.entryAdded.connect(added.append)
+	assert history.add(u'Saved', u'info') == 0
+	assert history.add(u'Saved', u'info') == 1
+	assert len(history) == 0
+	assert history.entry(1) is None
+	assert history.firstSeq == 2
+	assert not added
+
+
+def test_negative_size(qapp):
+	with pytest.raises(ValueError):
+		QNotificationHistory(maxEntries=-1)
+	with pytest.raises(ValueError):
+		QNotificationHistory(maxMessageLength=-1)
+
+
+def test_long_messages_are_cut_off(qapp):
+	history = QNotificationHistory(maxMessageLength=10)
+	seq = history.add(u'x' * 1000000, u'info')
+	assert history.entry(seq)[2] == u'x' * 10 + u'…'
+	# Cut through the two bytes of the last character
+	seq = history.add(u'é' * 100, u'info')
+	assert history.entry(seq)[2] == u'é' * 10 + u'…'
+	seq = history.add(u'é'.encode(u'utf-8') * 100, u'info')
+	assert history.entry(seq)[2] == u'é' * 5 + u'…'
+	seq = history.add(b'\xc3\xa9' * 4 + b'\xc3\xa9' * 100, u'info')
+	assert history.entry(seq)[2] == u'é' * 5 + u'…'
+	history = QNotificationHistory(maxMessageLength=None)
+	seq = history.add(u'x' * 100000, u'info')
+	assert len(history.entry(seq)[2]) == 100000
+
+
+@pytest.mark.parametrize(u'kwargs', [{u'history': False},
+	{u'historySize': 0}])
+def test_area_without_history(window, kwargs):
+	area = QNotificationArea(window, **kwargs)
+	area.setFixedWidth(600)
+	area.display(u'Saved', u'info')
+	assert len(area.history) == 0
+
+
+def test_shared_empty_history(window):
+	history = QNotificationHistory()
+	area = QNotificationArea(window, history=history)
+	assert area.history is history
+
+
+def test_manager_without_history(window):
+	manager = QNotificationManager(history=False)
+	area = QNotificationArea(window, manager=manager)
+	area.setFixedWidth(600)
+	area.display(u'Saved', u'info')
+	assert area.history is manager.history
+	assert len(manager.history) == 0
+
+
+def test_invalid_bytes(qapp):
+	history = QNotificationHistory(maxMessageLength=6)
+	seq = history.add(b'caf\xe9', u'info', timestamp=0)
+	assert history.entry(seq)[2] == u'caf�'
+	seq = history.add(b'caf\xe9 ' + u'é'.encode(u'utf-8') * 10, u'info')
+	assert history.entry(seq)[2] == u'caf� …'
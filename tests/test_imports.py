@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+	return subprocess.check_output([sys.executable, u'-c', code], cwd=ROOT,
+		universal_newlines=True).strip()
+
+
+def test_client_does_not_import_qt():
+	assert _run(u'import sys\n'
+		u'import QNotifications.client\n'
+		u'print(sorted(name for name in ("qtpy", "PyQt5", "PySide2") '
+		u'if name in sys.modules))') == u'[]'
+
+
+def test_package_exports():
+	import QNotifications
+	from QNotifications.QNotificationArea import QNotificationArea
+	assert QNotifications.QNotificationArea is QNotificationArea
+	assert set(QNotifications.__all__) <= set(dir(QNotifications))
+	for name in QNotifications.__all__:
+		assert getattr(QNotifications, name) is not None
+
+
+def test_submodules_do_not_hide_classes():
+	assert _run(u'import QNotifications.QNotificationArea\n'
+		u'import QNotifications\n'
+		u'print(isinstance(QNotifications.QNotificationHistory, type), '
+		u'isinstance(QNotifications.QNotificationArea, type))') == \
+		u'True True'
+
+
+def test_star_import():
+	assert _run(u'from QNotifications import *\n'
+		u'print(QNotificationArea.__name__, OUTCOME_CLICKED)') != u''
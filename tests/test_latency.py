@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from QNotifications import QNotificationArea
+from QNotifications.clock import VirtualClock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def _display_times(clock, handles, duration, step=10):
+	""" Advances the clock, and returns the time each handle was shown. """
+	shownAt = {}
+	closedAt = {}
+	for i in range(0, duration, step):
+		clock.advance(step)
+		for handle in handles:
+			if handle.notification is not None and handle.id not in shownAt:
+				shownAt[handle.id] = clock.elapsed()
+			if handle.done() and handle.id not in closedAt:
+				closedAt[handle.id] = clock.elapsed()
+	return dict((handle.id, closedAt[handle.id] - shownAt[handle.id])
+		for handle in handles if handle.id in closedAt)
+
+
+def test_latency_control_respects_floors(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, clock=clock)
+	area.setFixedWidth(600)
+	area.setLatencyTarget(10000)
+	handles = [area.display(u'Message {}'.format(i), u'info', 5000)
+		for i in range(20)]
+	durations = _display_times(clock, handles, 120000)
+	assert len(durations) == len(handles)
+	floor = area.latencyFloors[u'info']
+	# One step of tolerance for the sampling of the display times
+	assert min(durations.values()) >= floor - 10
+	assert min(durations.values()) < 5000
+
+
+def test_latency_control_without_target(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, clock=clock)
+	area.setFixedWidth(600)
+	handles = [area.display(u'Message {}'.format(i), u'info', 5000)
+		for i in range(6)]
+	durations = _display_times(clock, handles, 60000)
+	assert len(durations) == len(handles)
+	assert min(durations.values()) >= 5000 - 10
+
+
+def test_latency_control_large_queue(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, clock=clock)
+	area.setFixedWidth(600)
+	missed = []
+	area.latencyTargetMissed.connect(missed.append)
+	area.setLatencyTarget(10000)
+	for i in range(5000):
+		area.display(u'Message {}'.format(i), u'info', 5000)
+	clock.advance(1000)
+	# Even the shortest timeouts cannot drain the queue in time
+	assert area.stats()[u'timeout_scale'] == 0.0
+	assert missed and missed[0] > 0
+
+
+def test_latency_control_after_replace(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, clock=clock)
+	area.setFixedWidth(600)
+	area.setLatencyTarget(10000)
+	handles = [area.display(u'Message {}'.format(i), u'info', 5000)
+		for i in range(6)]
+	clock.advance(1000)
+	# Queued, and shown
+	queued = area.replace(handles[4], u'Replaced', u'info', 5000)
+	assert queued.queuedAt == handles[4].queuedAt
+	area.setExitEffect(u'fadeOut', 500)
+	shown = area.replace(handles[0], u'Replaced', u'info', 5000)
+	assert shown.queuedAt == clock.elapsed()
+	durations = _display_times(clock, handles[1:4] + [queued, shown,
+		handles[5]], 60000)
+	assert len(durations) == 6
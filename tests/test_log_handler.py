@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+import pytest
+
+from QNotifications import QNotificationArea
+from QNotifications.QNotificationLogHandler import QNotificationLogHandler
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+@pytest.fixture
+def logger(window):
+	area = QNotificationArea(window, maxMessages=10)
+	area.setFixedWidth(600)
+	handler = QNotificationLogHandler(area, maxRate=100)
+	logger = logging.getLogger(u'tests.log_handler')
+	logger.propagate = False
+	logger.addHandler(handler)
+	yield logger, handler, area
+	logger.removeHandler(handler)
+	handler.close()
+
+
+def _messages(area):
+	return sorted(handle.text() for handle in area._handles.values())
+
+
+@pytest.mark.parametrize(u'msg', [
+	{u'disk': u'full'},
+	[1, 2, 3],
+	set([u'a']),
+	42,
+	None,
+])
+def test_non_string_messages(logger, msg):
+	logger, handler, area = logger
+	logger.warning(msg)
+	logger.warning(msg)
+	handler._flush()
+	assert _messages(area) == [u'{} (2×)'.format(msg)]
+
+
+def test_unrepresentable_message(logger):
+	logger, handler, area = logger
+
+	class Message(object):
+		__hash__ = None
+
+		def __repr__(self):
+			raise RuntimeError(u'no repr')
+
+		def __str__(self):
+			return u'message'
+
+	logger.warning(Message())
+	logger.warning(Message())
+	handler._flush()
+	assert _messages(area) == [u'message', u'message']
+
+
+def test_records_are_combined(logger):
+	logger, handler, area = logger
+	for i in range(3):
+		logger.warning(u'disk %s almost full', i)
+	logger.error(u'failed')
+	handler._flush()
+	assert _messages(area) == [u'disk 2 almost full (3×)', u'failed']
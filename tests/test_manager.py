@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from qtpy import QtWidgets
+
+from QNotifications import QNotificationArea, QNotificationManager, \
+	OUTCOME_TIMED_OUT
+from QNotifications.clock import VirtualClock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def _areas(window, manager, count=2):
+	areas = []
+	for i in range(count):
+		widget = QtWidgets.QWidget(window)
+		widget.resize(300, 400)
+		widget.show()
+		area = QNotificationArea(widget, manager=manager)
+		area.setFixedWidth(300)
+		areas.append(area)
+	return areas
+
+
+def test_broadcast_waits_while_all_areas_are_suspended(window):
+	clock = VirtualClock()
+	manager = QNotificationManager(clock=clock)
+	areas = _areas(window, manager)
+	for area in areas:
+		area.suspend()
+	handle = manager.display(u'Server going down', u'danger', 1000,
+		broadcast=True)
+	clock.advance(5000)
+	assert not handle.done()
+	assert handle.notification is None
+	assert manager.queueSize() == 1
+	areas[1].resume()
+	assert manager.queueSize() == 0
+	assert handle.notification is not None
+	assert [area for area, notification in manager._copies[handle.id]] == \
+		[areas[1]]
+	clock.advance(1100)
+	assert handle.outcome == OUTCOME_TIMED_OUT
+
+
+def test_timeout_frozen_in_suspended_areas(window):
+	clock = VirtualClock()
+	manager = QNotificationManager(clock=clock)
+	areas = _areas(window, manager)
+	handle = manager.display(u'Server going down', u'danger', 1000,
+		broadcast=True)
+	clock.advance(400)
+	for area in areas:
+		area.suspend()
+	clock.advance(5000)
+	assert not handle.done()
+	areas[0].resume()
+	clock.advance(500)
+	assert not handle.done()
+	clock.advance(200)
+	assert handle.outcome == OUTCOME_TIMED_OUT
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from qtpy import QtGui
+
+from QNotifications import QNotificationArea
+from QNotifications.QNotification import BACKGROUND_CACHE_PREFIX
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def test_only_notification_backgrounds_are_cached(window, monkeypatch):
+	keys = []
+	insert = QtGui.QPixmapCache.insert
+
+	def record(key, pixmap):
+		keys.append(key)
+		return insert(key, pixmap)
+
+	monkeypatch.setattr(QtGui.QPixmapCache, u'insert', record)
+	QtGui.QPixmapCache.clear()
+	area = QNotificationArea(window, maxMessages=5)
+	area.setFixedWidth(600)
+	for i in range(5):
+		area.display(u'Message {}'.format(i), u'info', None)
+		area.grab()
+	assert keys
+	assert all(key.startswith(BACKGROUND_CACHE_PREFIX + u'QNotification/')
+		for key in keys)
+	assert area.stats()[u'paint_count'] >= 5
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+
+from QNotifications import QNotificationArea, QNotificationServer
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+@pytest.fixture
+def server(window):
+	area = QNotificationArea(window)
+	area.setFixedWidth(600)
+	server = QNotificationServer(area,
+		u'qnotifications-test-{}'.format(os.getpid()))
+	rejected = []
+	server.notificationRejected.connect(rejected.append)
+	yield server, area, rejected
+	server.close()
+
+
+def test_valid_notification(server):
+	server, area, rejected = server
+	server._display({u'message': u'Saved', u'category': u'info',
+		u'timeout': None, u'autohide': True, u'buttontext': u'OK'})
+	server._display({u'message': u'Saved', u'category': u'success'})
+	assert not rejected
+	handles = sorted(area._handles.values(), key=lambda handle: handle.id)
+	assert [handle.timeout for handle in handles] == [None, 5000]
+	assert handles[0].autohide is True
+	assert handles[0].buttontext == u'OK'
+
+
+@pytest.mark.parametrize(u'item', [
+	[u'Saved', u'info'],
+	{u'category': u'info'},
+	{u'message': u'Saved'},
+	{u'message': 42, u'category': u'info'},
+	{u'message': u'Saved', u'category': u'unknown'},
+	{u'message': u'Saved', u'category': u'info', u'timeout': u'5000'},
+	{u'message': u'Saved', u'category': u'info', u'timeout': 1.5},
+	{u'message': u'Saved', u'category': u'info', u'timeout': True},
+	{u'message': u'Saved', u'category': u'info', u'timeout': -1},
+	{u'message': u'Saved', u'category': u'info', u'autohide': u'false'},
+	{u'message': u'Saved', u'category': u'info', u'autohide': 1},
+	{u'message': u'Saved', u'category': u'info', u'buttontext': 1},
+])
+def test_invalid_notification(server, item):
+	server, area, rejected = server
+	server._display(item)
+	assert len(rejected) == 1
+	assert not area._handles
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from QNotifications import QNotificationArea, OUTCOME_TIMED_OUT
+from QNotifications.clock import VirtualClock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+@pytest.mark.parametrize(u'useQueue', [True, False])
+def test_held_back_while_suspended(window, useQueue):
+	clock = VirtualClock()
+	area = QNotificationArea(window, useQueue=useQueue, clock=clock)
+	area.setFixedWidth(600)
+	area.suspend()
+	handle = area.display(u'Saved', u'info', 1000)
+	clock.advance(5000)
+	assert not handle.done()
+	assert handle.notification is None
+	area.resume()
+	assert handle.notification is not None
+	clock.advance(900)
+	assert not handle.done()
+	clock.advance(200)
+	assert handle.outcome == OUTCOME_TIMED_OUT
+
+
+@pytest.mark.parametrize(u'useQueue', [True, False])
+def test_timeout_frozen_while_suspended(window, useQueue):
+	clock = VirtualClock()
+	area = QNotificationArea(window, useQueue=useQueue, clock=clock)
+	area.setFixedWidth(600)
+	handle = area.display(u'Saved', u'info', 1000)
+	clock.advance(400)
+	area.suspend()
+	clock.advance(5000)
+	assert not handle.done()
+	area.resume()
+	clock.advance(500)
+	assert not handle.done()
+	clock.advance(200)
+	assert handle.outcome == OUTCOME_TIMED_OUT
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+from qtpy import QtGui
+
+from QNotifications import QNotificationArea, QNotificationManager
+from QNotifications.QNotification import preview_message, elide_message
+from QNotifications.clock import VirtualClock
+from QNotifications.textcache import TextLayoutCache
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def _wait_for_height(cache, text, timeout=5):
+	end = time.time() + timeout
+	while time.time() < end:
+		height = cache.height(text, cache.width)
+		if height is not None:
+			return height
+		time.sleep(0.01)
+	return None
+
+
+def test_preview_message():
+	message = u'é' * 100 + u'\n' * 30
+	for maxChars in (None, 10, 99, 100, 101, 1000):
+		for maxLines in (None, 5):
+			expected = elide_message(message, maxChars, maxLines)[0]
+			assert preview_message(message, maxChars, maxLines) == expected
+			assert preview_message(message.encode(u'utf-8'), maxChars,
+				maxLines) == expected
+
+
+def test_queued_bytes_are_not_decoded(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, maxMessages=1, preLayout=True,
+		clock=clock, maxChars=50)
+	area.setFixedWidth(600)
+	area.display(u'Shown', u'info', 1000)
+	message = u'Queued café '.encode(u'utf-8') * 1000
+	handle = area.display(message, u'info', 1000)
+	assert handle.notification is None
+	assert handle._message is message
+	cache = area.textLayoutCache
+	preview = preview_message(message, 50, area.maxLines)
+	assert _wait_for_height(cache, preview) is not None
+	# Laid out again at another width
+	area.setFixedWidth(500)
+	cache.setGeometry(cache.font, cache.width - 100)
+	assert handle._message is message
+	assert _wait_for_height(cache, preview) is not None
+	clock.advance(1100)
+	assert handle.notification is not None
+	area.textLayoutCache.close()
+
+
+def test_managed_bytes_are_not_decoded(window):
+	clock = VirtualClock()
+	manager = QNotificationManager(maxMessages=1, clock=clock)
+	area = QNotificationArea(window, manager=manager, preLayout=True)
+	area.setFixedWidth(600)
+	area.display(u'Shown', u'info', 1000)
+	handle = area.display(b'Queued caf\xc3\xa9', u'info', 1000)
+	assert handle.notification is None
+	assert isinstance(handle._message, bytes)
+	assert _wait_for_height(area.textLayoutCache, u'Queued café') is not None
+	area.textLayoutCache.close()
+
+
+def test_invalid_bytes_in_queue(window):
+	clock = VirtualClock()
+	area = QNotificationArea(window, maxMessages=1, clock=clock)
+	area.setFixedWidth(600)
+	first = area.display(u'Shown', u'info', 1000)
+	handle = area.display(b'caf\xe9', u'info', 1000)
+	last = area.display(u'Last', u'info', 1000)
+	clock.advance(1100)
+	assert first.done()
+	assert handle.notification is not None
+	assert handle.text() == u'caf�'
+	clock.advance(1100)
+	assert last.notification is not None
+	entries = [area.history.entry(seq)[2] for seq in
+		range(area.history.firstSeq, area.history.lastSeq + 1)]
+	assert entries == [u'Shown', u'caf�', u'Last']
+
+
+def test_preview_of_invalid_bytes():
+	message = b'caf\xe9 ' + u'é'.encode(u'utf-8') * 100
+	expected = elide_message(message.decode(u'utf-8', u'replace'), 10)[0]
+	assert preview_message(message, 10) == expected
+	assert preview_message(message) == message.decode(u'utf-8', u'replace')
+
+
+def test_heights_per_width(qapp):
+	messages = [u'Message {}'.format(i) for i in range(20)]
+	cache = TextLayoutCache(lambda: messages, maxWidths=2)
+	font = QtGui.QFont()
+	cache.setGeometry(font, 300)
+	cache.setGeometry(font, 200)
+	assert _wait_for_height(cache, messages[-1]) is not None
+	assert cache.height(messages[-1], 300) is not None
+	# Alternating between known widths keeps the results
+	cache.setGeometry(font, 300)
+	cache.setGeometry(font, 200)
+	assert cache.stats()[u'size'] == 40
+	cache.prefetch([u'New'])
+	assert _wait_for_height(cache, u'New') is not None
+	assert cache.height(u'New', 300) is not None
+	# The least recently reported width is dropped
+	cache.setGeometry(font, 100)
+	assert cache.stats()[u'widths'] == [200, 100]
+	assert cache.height(messages[0], 300) is None
+	cache.close()
+
+
+def test_close_drops_backlog(qapp):
+	messages = [u'Long message {} '.format(i) * 500 for i in range(2000)]
+	cache = TextLayoutCache(lambda: messages)
+	cache.setGeometry(QtGui.QFont(), 300)
+	thread = cache._thread
+	start = time.time()
+	cache.close()
+	assert time.time() - start < 1
+	assert not thread.is_alive()
+	assert cache.stats()[u'size'] < len(messages)
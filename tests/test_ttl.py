@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Python3 compatibility
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from QNotifications import QNotificationArea, QNotificationManager, \
+	OUTCOME_EXPIRED, OUTCOME_REPLACED
+from QNotifications.clock import VirtualClock
+
+__author__ = u"Daniel Schreij"
+__license__ = u"GPLv3"
+
+
+def _area(window, managed, **kwargs):
+	clock = VirtualClock()
+	if managed:
+		manager = QNotificationManager(maxMessages=1, clock=clock, **kwargs)
+		area = QNotificationArea(window, manager=manager)
+	else:
+		area = QNotificationArea(window, maxMessages=1, clock=clock, **kwargs)
+	area.setFixedWidth(600)
+	return area, clock
+
+
+@pytest.mark.parametrize(u'managed', [False, True])
+def test_expires_in_queue(window, managed):
+	area, clock = _area(window, managed, ttl=2000)
+	area.display(u'Shown', u'info', None)
+	handle = area.display(u'Queued', u'info', 1000)
+	clock.advance(2100)
+	assert handle.outcome == OUTCOME_EXPIRED
+
+
+@pytest.mark.parametrize(u'managed', [False, True])
+def test_replaced_in_queue_keeps_expiry(window, managed):
+	area, clock = _area(window, managed, ttl=2000)
+	area.display(u'Shown', u'info', None)
+	old = area.display(u'Queued', u'info', 1000)
+	clock.advance(1500)
+	handle = area.replace(old, u'Replaced', u'info', 1000)
+	assert old.outcome == OUTCOME_REPLACED
+	assert handle.expiresAt == old.expiresAt
+	clock.advance(600)
+	assert handle.outcome == OUTCOME_EXPIRED
+
+
+@pytest.mark.parametrize(u'managed', [False, True])
+def test_replacement_of_finished_notification_expires(window, managed):
+	area, clock = _area(window, managed)
+	area.display(u'Shown', u'info', None)
+	old = area.display(u'Queued', u'info', 1000)
+	area.remove(old)
+	handle = area.replace(old, u'Replaced', u'info', 1000, ttl=500)
+	assert handle.notification is None
+	clock.advance(1100)
+	assert handle.outcome == OUTCOME_EXPIRED